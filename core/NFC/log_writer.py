@@ -0,0 +1,101 @@
+"""
+Access Log Writer
+Path: core/NFC/log_writer.py
+
+Moves access-log inserts off the tap hot path. Taps enqueue plain row dicts;
+a daemon thread drains the queue and writes them in batches, one transaction
+per batch.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.database.modelsfiles.access_log import AccessLog
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AccessLogWriter:
+    """
+    Background batch writer for AccessLog rows.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session],
+                 batch_size: int = 500, flush_interval: float = 0.2, async_commit: bool = True):
+        """
+        Args:
+            session_factory: Callable returning a new SQLAlchemy session (e.g. SessionLocal).
+            batch_size: Maximum rows written per transaction.
+            flush_interval: Maximum seconds a queued row waits before being written.
+            async_commit: PostgreSQL only: commit batches with synchronous_commit off, so
+                the writer does not wait for the WAL flush. A crash can lose the last
+                batches, never corrupt them.
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.async_commit = async_commit
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="access-log-writer", daemon=True)
+
+    def start(self):
+        """Start the writer thread."""
+        self._thread.start()
+        logger.info("Access log writer started.")
+
+    def submit(self, row: dict):
+        """Queue one access log row (AccessLog attribute names as keys)."""
+        self._queue.put(row)
+
+    def stop(self, timeout: float = 5.0):
+        """Flush pending rows and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        logger.info("Access log writer stopped.")
+
+    def _run(self):
+        while True:
+            row = self._queue.get()
+            if row is _STOP:
+                return
+
+            batch = [row]
+            deadline = time.monotonic() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch: list):
+        session = self.session_factory()
+        try:
+            if self.async_commit and session.get_bind().dialect.name == 'postgresql':
+                session.execute(text("SET LOCAL synchronous_commit = OFF"))
+            AccessLog.bulk_create_logs(session, batch, batch_size=self.batch_size)
+            session.commit()
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} access logs: {e}")
+            session.rollback()
+        finally:
+            session.close()
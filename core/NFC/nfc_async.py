@@ -0,0 +1,49 @@
+"""
+Async NFC Handler
+Path: core/NFC/nfc_async.py
+
+asyncio front-end for NFCHandler so that several readers can share one event
+loop and overlap their database I/O. Requires an async driver
+(e.g. DATABASE_URL=postgresql+asyncpg://...).
+"""
+
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.NFC.nfc_handler import NFCHandler
+from core.NFC.log_writer import AccessLogWriter
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncNFCHandler:
+    """
+    Awaitable wrapper around NFCHandler.
+
+    The decision logic stays in NFCHandler and the models; it is run through
+    AsyncSession.run_sync, so every lazy load or flush it triggers is awaited on
+    the async driver instead of blocking the event loop. Use one instance (and
+    one AsyncSession) per reader.
+    """
+
+    def __init__(self, async_session: AsyncSession, log_writer: AccessLogWriter = None):
+        """
+        Args:
+            async_session: AsyncSession owned by this reader.
+            log_writer: (Optional) Background writer passed on to NFCHandler.
+        """
+        self.session = async_session
+        self.log_writer = log_writer
+        self._handler: NFCHandler = None
+
+    async def process_tap(self, raw_uid: str, zone_id: int, device_id: str = None) -> dict:
+        """Async counterpart of NFCHandler.process_tap (same arguments and result)."""
+        return await self.session.run_sync(self._process_tap, raw_uid, zone_id, device_id)
+
+    def _process_tap(self, sync_session, raw_uid: str, zone_id: int, device_id: str) -> dict:
+        # Built lazily because warming the caches issues queries, which is only
+        # allowed inside run_sync
+        if self._handler is None:
+            self._handler = NFCHandler(sync_session, log_writer=self.log_writer)
+        return self._handler.process_tap(raw_uid, zone_id, device_id)
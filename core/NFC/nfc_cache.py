@@ -0,0 +1,190 @@
+"""
+NFC Lookup Caches
+Path: core/NFC/nfc_cache.py
+
+In-process lookup structures that keep the per-tap hot path off the database.
+The database stays authoritative: every cache miss falls back to a query.
+"""
+
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from core.database.modelsfiles.card import Card
+from core.database.modelsfiles.user import User
+from core.database.modelsfiles.zone import Zone
+from core.database.modelsfiles.access_policy import AccessPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class CardHashIndex:
+    """
+    Equality-only index mapping cards.uid_hash to cards.id.
+
+    Emulates a hash index for backends that lack one (e.g. SQLite) and is kept
+    in sync with local writes through SQLAlchemy mapper events.
+    """
+
+    def __init__(self):
+        self._ids: dict[bytes, int] = {}
+        self.is_warm = False
+
+    def warm(self, session: Session):
+        """Load every known uid_hash -> id pair in a single query."""
+        self._ids = {uid_hash: card_id for uid_hash, card_id in session.query(Card.uid_hash, Card.id)}
+        self.is_warm = True
+        logger.info(f"Card hash index warmed with {len(self._ids)} entries.")
+
+    def get(self, uid_hash: bytes) -> Optional[int]:
+        """Return the card id for a hash, or None if unknown."""
+        return self._ids.get(uid_hash)
+
+    def add(self, uid_hash: bytes, card_id: int):
+        """Record a hash -> id pair (e.g. after a cache miss)."""
+        self._ids[uid_hash] = card_id
+
+    def discard(self, uid_hash: bytes):
+        """Drop a hash from the index if present."""
+        self._ids.pop(uid_hash, None)
+
+    def clear(self):
+        """Empty the index; the next handler will warm it again."""
+        self._ids = {}
+        self.is_warm = False
+
+    # Mapper event hooks
+
+    def _on_card_saved(self, mapper, connection, target: Card):
+        for old_hash in inspect(target).attrs.uid_hash.history.deleted or ():
+            self.discard(old_hash)
+        self.add(target.uid_hash, target.id)
+
+    def _on_card_deleted(self, mapper, connection, target: Card):
+        self.discard(target.uid_hash)
+
+
+# Shared per-process index
+card_hash_index = CardHashIndex()
+
+event.listen(Card, 'after_insert', card_hash_index._on_card_saved)
+event.listen(Card, 'after_update', card_hash_index._on_card_saved)
+event.listen(Card, 'after_delete', card_hash_index._on_card_deleted)
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire ``ttl`` seconds after insertion.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class HandlerCache:
+    """
+    Per-handler caches for the tap hot path: cards by uid_hash, zones by id,
+    compiled policy evaluators by zone id.
+
+    Cached objects belong to the handler's session. Writes flushed through any
+    other session in this process evict the affected entries; changes made by
+    other processes are picked up once the TTL runs out.
+    """
+
+    def __init__(self, session: Session, card_ttl: float = 30, zone_ttl: float = 300):
+        self.session = session
+        self.cards = TTLCache(maxsize=10_000, ttl=card_ttl)
+        self.zones = TTLCache(maxsize=1024, ttl=zone_ttl)
+        self.policies = TTLCache(maxsize=1024, ttl=zone_ttl)
+        _handler_caches.add(self)
+
+    def warm_zones(self):
+        """Preload every zone in a single query; zones are few and rarely change."""
+        for zone in self.session.query(Zone):
+            self.zones[zone.id] = zone
+        logger.info(f"Zone cache warmed with {len(self.zones)} entries.")
+
+    def _foreign(self, target) -> bool:
+        """True if target was written by a session other than ours."""
+        return object_session(target) is not self.session
+
+
+_handler_caches: "weakref.WeakSet[HandlerCache]" = weakref.WeakSet()
+
+
+def _evict_card(mapper, connection, target: Card):
+    for cache in list(_handler_caches):
+        if cache._foreign(target):
+            cache.cards.pop(target.uid_hash)
+            for old_hash in inspect(target).attrs.uid_hash.history.deleted or ():
+                cache.cards.pop(old_hash)
+
+
+def _evict_user(mapper, connection, target: User):
+    # Cards are keyed by hash, so drop them all; user edits are rare
+    for cache in list(_handler_caches):
+        if cache._foreign(target):
+            cache.cards.clear()
+
+
+def _evict_zone(mapper, connection, target: Zone):
+    for cache in list(_handler_caches):
+        if cache._foreign(target):
+            cache.zones.pop(target.id)
+
+
+def _evict_policies(mapper, connection, target: AccessPolicy):
+    # Compiled evaluators are snapshots, so our own writes evict them too
+    zone_ids = {target.zone_id, *(inspect(target).attrs.zone_id.history.deleted or ())}
+    for cache in list(_handler_caches):
+        for zone_id in zone_ids:
+            cache.policies.pop(zone_id)
+
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(AccessPolicy, _event, _evict_policies)
+
+for _event in ('after_update', 'after_delete'):
+    event.listen(Card, _event, _evict_card)
+    event.listen(User, _event, _evict_user)
+    event.listen(Zone, _event, _evict_zone)
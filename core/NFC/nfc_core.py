@@ -17,20 +17,27 @@ class NFCReader:
     Base class for interacting with physical NFC readers.
     """
     
-    def __init__(self, device_path: str = None, use_mock: bool = False):
+    def __init__(self, device_path: str = None, use_mock: bool = False,
+                 irq_chip: str = None, irq_line: int = None):
         """
         Initialize the NFC Reader.
         
         Args:
             device_path: Optional path to the hardware device (e.g., USB port).
             use_mock: If True, uses simulated hardware for testing.
+            irq_chip: Optional GPIO chip (e.g., '/dev/gpiochip0') wired to the reader's IRQ pin.
+            irq_line: GPIO line offset of the IRQ pin on irq_chip.
         """
         self.device_path = device_path
         self.use_mock = use_mock
         self.is_connected = False
+        self._irq = None
+        self._next_poll = 0.0  # monotonic time of the next polling slot
         
         if not self.use_mock:
             self._init_hardware()
+            if irq_chip and irq_line is not None:
+                self._init_irq(irq_chip, irq_line)
         else:
             logger.info("NFCReader initialized in MOCK mode.")
             self.is_connected = True
@@ -50,6 +57,48 @@ class NFCReader:
             logger.error(f"Failed to initialize NFC hardware: {e}")
             self.is_connected = False
 
+    def _init_irq(self, chip: str, line: int):
+        """
+        Request the reader's IRQ GPIO line so the listener can sleep until the
+        reader signals "data ready" instead of polling.
+        """
+        try:
+            import gpiod
+            from gpiod.line import Edge
+
+            self._irq = gpiod.request_lines(
+                chip,
+                consumer="nfc-reader",
+                config={line: gpiod.LineSettings(edge_detection=Edge.FALLING)},
+            )
+            logger.info(f"NFC IRQ enabled on {chip} line {line}.")
+        except Exception as e:
+            logger.warning(f"NFC IRQ unavailable, falling back to polling: {e}")
+            self._irq = None
+
+    def wait_for_card(self, timeout: float) -> bool:
+        """
+        Block until the reader may have a card in the field.
+        
+        With an IRQ line this sleeps in the kernel until the line fires (or
+        timeout expires); otherwise it sleeps until the next polling slot. Slots
+        are `timeout` apart on the monotonic clock, so time spent handling a tap
+        does not stretch the polling period (an overrun polls immediately).
+        
+        Returns:
+            True if a read should be attempted.
+        """
+        if self._irq is None:
+            now = time.monotonic()
+            self._next_poll = max(self._next_poll + timeout, now)
+            time.sleep(self._next_poll - now)
+            return True
+
+        if not self._irq.wait_edge_events(timeout):
+            return False
+        self._irq.read_edge_events()  # Drain so the next wait blocks again
+        return True
+
     def read_uid(self, timeout: int = 5) -> Optional[str]:
         """
         Read the UID of an NFC card presented to the reader.
@@ -73,7 +122,7 @@ class NFCReader:
 
         # Placeholder for actual hardware read logic:
         # try:
-        #     target = self.clf.connect(rdwr={'on-connect': lambda tag: False})
+        #     target = self.clf.connect(rdwr={'on-connect': lambda tag: False, 'iterations': 1, 'interval': 0})
         #     if target:
         #         return target.identifier.hex().upper()
         # except Exception as e:
@@ -81,24 +130,36 @@ class NFCReader:
         
         return None
 
-    def start_listening(self, callback: Callable[[str], None], interval: float = 0.5):
+    def start_listening(self, callback: Callable[[str], None], interval: float = 0.5,
+                        cooldown: float = 2.0):
         """
         Continuously listen for cards and trigger a callback when one is found.
         
         Args:
             callback: Function to call when a UID is read. Must accept UID string.
-            interval: Delay between polling attempts.
+            interval: Delay between polling attempts (IRQ wait timeout when an IRQ line is set).
+            cooldown: Repeat reads of the same UID within this many seconds are ignored;
+                      other cards are processed immediately.
         """
         logger.info("Started continuous NFC listening...")
+        last_seen: dict[str, float] = {}
+        next_prune = time.monotonic() + 10.0
         try:
             while True:
+                if not self.wait_for_card(interval):
+                    continue
                 uid = self.read_uid(timeout=1)
-                if uid:
-                    logger.debug(f"Card detected with UID: {uid}")
-                    callback(uid)
-                    # Sleep to prevent multiple reads of the same tap
-                    time.sleep(2) 
-                time.sleep(interval)
+                if not uid:
+                    continue
+                now = time.monotonic()
+                if now - last_seen.get(uid, -cooldown) < cooldown:
+                    continue
+                last_seen[uid] = now
+                if now >= next_prune:
+                    last_seen = {k: t for k, t in last_seen.items() if now - t < cooldown}
+                    next_prune = now + 10.0
+                logger.debug(f"Card detected with UID: {uid}")
+                callback(uid)
         except KeyboardInterrupt:
             logger.info("NFC listening stopped by user.")
         finally:
@@ -108,6 +169,8 @@ class NFCReader:
         """Release hardware resources."""
         if not self.use_mock:
             # self.clf.close()
-            pass
+            if self._irq is not None:
+                self._irq.release()
+                self._irq = None
         self.is_connected = False
         logger.info("NFCReader resources cleaned up.")
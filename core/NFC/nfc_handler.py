@@ -6,11 +6,17 @@ Bridges the hardware layer with the database models.
 Processes taps, validates policies, and logs access attempts.
 """
 
+import functools
 import logging
-from sqlalchemy.orm import Session
+import re
+import string
+import time
 from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.orm import Session
 
 # Importing Enums and Base configurations
+from core.database.corefiles.clock import utcnow
 from core.database.corefiles.enums import AccessStatus
 
 # Importing Models
@@ -18,23 +24,50 @@ from core.database.modelsfiles.card import Card
 from core.database.modelsfiles.zone import Zone
 from core.database.modelsfiles.user import User
 from core.database.modelsfiles.access_log import AccessLog
+from core.database.modelsfiles.access_policy import AccessPolicy
+
+from core.NFC.nfc_cache import card_hash_index, HandlerCache
+from core.NFC.log_writer import AccessLogWriter
+from core.NFC.policy_evaluator import PolicyEvaluator, Decision
 
 logger = logging.getLogger(__name__)
 
+# Drops ':' separators and upper-cases the UID in a single pass
+_UID_TRANSLATE = str.maketrans(string.ascii_lowercase, string.ascii_uppercase, ':')
+
+# Denial reason keywords -> AccessStatus, one group per status (matched in a single scan)
+_REASON_RE = re.compile(r'(expired)|(suspended|lost|stolen)|(inactive)', re.IGNORECASE)
+_REASON_STATUSES = (AccessStatus.EXPIRED, AccessStatus.BLACKLISTED, AccessStatus.INACTIVE)
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_and_hash(raw_uid: str) -> tuple[str, bytes]:
+    """Normalized UID and its hash, memoized on the raw reader string (repeat taps skip both steps)"""
+    clean_uid = raw_uid.translate(_UID_TRANSLATE).strip()
+    return clean_uid, Card.hash_uid(clean_uid)
+
+
 class NFCHandler:
     """
     Handles the business logic for NFC card taps.
     Evaluates users, cards, zones, and policies to grant or deny access.
     """
 
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, log_writer: AccessLogWriter = None):
         """
         Initialize handler with a database session.
         
         Args:
             db_session: SQLAlchemy active session.
+            log_writer: (Optional) Background writer; when given, access logs are
+                queued and batch-inserted instead of committed with every tap.
         """
         self.session = db_session
+        self.log_writer = log_writer
+        self._cache = HandlerCache(db_session)
+        self._cache.warm_zones()
+        if not card_hash_index.is_warm:
+            card_hash_index.warm(db_session)
 
     def process_tap(self, raw_uid: str, zone_id: int, device_id: str = None) -> dict:
         """
@@ -48,17 +81,17 @@ class NFCHandler:
         Returns:
             dict: Containing 'success' (bool), 'status' (AccessStatus value), and 'message' (str).
         """
-        start_time = datetime.utcnow()
+        start_ns = time.monotonic_ns()
+        now = utcnow()  # one clock reading for every check, counter and log of this decision
         decision_reason = ""
         access_status = AccessStatus.DENIED
         
         # 1. Clean and hash the UID
-        clean_uid = raw_uid.replace(":", "").upper().strip()
-        uid_hash = Card.hash_uid(clean_uid)
+        clean_uid, uid_hash = _clean_and_hash(raw_uid)
 
         # 2. Fetch the Card and Zone from DB
-        card = self.session.query(Card).filter(Card.uid_hash == uid_hash).first()
-        zone = self.session.query(Zone).filter(Zone.id == zone_id).first()
+        card = self._get_card(uid_hash)
+        zone = self._get_zone(zone_id)
 
         try:
             # --- Validation Phase ---
@@ -67,77 +100,160 @@ class NFCHandler:
             if not zone:
                 access_status = AccessStatus.INVALID_ZONE
                 decision_reason = f"Zone ID {zone_id} does not exist."
-                return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_time)
+                return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_ns, now)
 
             # Step B: Validate Card existence
             if not card:
                 access_status = AccessStatus.INVALID_CARD
                 decision_reason = "Unregistered or invalid card."
-                return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_time)
+                return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_ns, now)
 
             # Step C: Use Card Model's built-in validation (Checks Card Status, Expiry, User Status, User Zone Access)
-            is_card_valid, card_reason = card.check_access(zone=zone)
+            is_card_valid, card_reason = card.check_access(zone=zone, now=now)
             if not is_card_valid:
                 # Map reason to appropriate AccessStatus
                 access_status = self._map_reason_to_status(card_reason, card)
                 decision_reason = card_reason
-                return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_time)
+                return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_ns, now)
 
             # Step D: Use Zone Model's built-in validation (Checks Capacity, Active status, Restictions, Operating hours)
-            can_enter_zone, zone_reason = zone.can_enter(user=card.user)
+            # No user is passed: Step C already checked zone membership, so the EXISTS query runs once per tap
+            can_enter_zone, zone_reason = zone.can_enter(now=now)
             if not can_enter_zone:
                 access_status = AccessStatus.INVALID_TIME if "closed" in zone_reason.lower() else AccessStatus.DENIED
                 decision_reason = zone_reason
-                return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_time)
+                return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_ns, now)
 
-            # Step E: (Optional) If you have active policies, you would check them here.
-            # active_policies = zone.get_active_policies()
-            # for policy in active_policies:
-            #     policy_pass, p_reason = policy.check_access(user=card.user)
-            #     if not policy_pass: ...
+            # Step E: Zone policies, precompiled into a single decision function per zone
+            policy_pass, policy_reason = self._get_policy_evaluator(zone.id)(card.user, now)
+            if not policy_pass:
+                access_status = AccessStatus.INVALID_TIME if "time" in policy_reason else AccessStatus.DENIED
+                decision_reason = policy_reason
+                return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_ns, now)
 
             # --- Access Granted Phase ---
             access_status = AccessStatus.GRANTED
             decision_reason = "Access Granted"
             
-            # Update entity statistics (using built-in model methods)
-            card.update_usage()
-            card.reset_failed_attempts()
-            card.user.update_last_access()
-            zone.increment_occupancy()
+            # Update entity statistics (one UPDATE per table, see _record_grant); a tap
+            # that loses the race for the last free place is denied after all
+            if not self._record_grant(card, zone, now):
+                access_status = AccessStatus.DENIED
+                decision_reason = "Zone is at maximum capacity"
+                return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_ns, now)
             
-            return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_time)
+            return self._finalize_attempt(clean_uid, access_status, decision_reason, card, zone, device_id, start_ns, now)
 
         except Exception as e:
             logger.error(f"Error processing tap for UID {raw_uid}: {str(e)}")
             self.session.rollback()
             return {"success": False, "status": AccessStatus.DENIED.value, "message": "Internal Server Error"}
 
+    def _get_card(self, uid_hash: bytes) -> Card:
+        """
+        Resolve a card by hash. Served from the handler cache when possible,
+        otherwise via the in-process hash index (primary-key fetch) or a query.
+        The owning user is joined into the same SELECT (Card.user is lazy='joined').
+        """
+        card = self._cache.cards.get(uid_hash)
+        if card is not None:
+            return card
+
+        card = None
+        card_id = card_hash_index.get(uid_hash)
+        if card_id is not None:
+            card = self.session.get(Card, card_id, populate_existing=True)
+            if card is None or card.uid_hash != uid_hash:
+                card_hash_index.discard(uid_hash)
+                card = None
+
+        if card is None:
+            card = (
+                self.session.query(Card)
+                .populate_existing()
+                .filter(Card.uid_fp == Card.uid_fingerprint(uid_hash), Card.uid_hash == uid_hash)
+                .first()
+            )
+            if card is None:
+                return None
+            card_hash_index.add(uid_hash, card.id)
+
+        self._cache.cards[uid_hash] = card
+        return card
+
+    def _get_zone(self, zone_id: int) -> Zone:
+        """Resolve a zone by id, served from the handler cache when possible."""
+        zone = self._cache.zones.get(zone_id)
+        if zone is None:
+            zone = self.session.get(Zone, zone_id, populate_existing=True)
+            if zone is not None:
+                self._cache.zones[zone_id] = zone
+        return zone
+
+    def _get_policy_evaluator(self, zone_id: int) -> Decision:
+        """Compiled policy check for a zone, built on first use and cached until a policy changes."""
+        decide = self._cache.policies.get(zone_id)
+        if decide is None:
+            policies = self.session.query(AccessPolicy).filter_by(zone_id=zone_id, is_active=True).all()
+            decide = PolicyEvaluator.compile(policies)
+            self._cache.policies[zone_id] = decide
+        return decide
+
+    def _record_grant(self, card: Card, zone: Zone, now: datetime) -> bool:
+        """
+        Apply the grant-path bookkeeping as fused, atomic UPDATE statements.
+        Same effect as zone.increment_occupancy() (itself a guarded UPDATE) +
+        card.update_usage() + card.reset_failed_attempts() + user.update_last_access();
+        the loaded objects are synchronized in memory so nothing is left dirty for
+        the flush.
+        
+        Returns:
+            bool: False (and nothing updated) if the zone filled up since can_enter
+        """
+        if not zone.increment_occupancy(now):
+            return False
+        self.session.execute(
+            update(Card).where(Card.id == card.id).values(
+                total_uses=Card.total_uses + 1, last_used=now,
+                failed_attempts=0, last_failed_attempt=None,
+            )
+        )
+        self.session.execute(update(User).where(User.id == card.user_id).values(last_access=now))
+        return True
+
     def _finalize_attempt(self, uid: str, status: AccessStatus, reason: str, 
-                          card: Card, zone: Zone, device_id: str, start_time: datetime) -> dict:
+                          card: Card, zone: Zone, device_id: str, start_ns: int, now: datetime) -> dict:
         """
         Helper method to log the attempt to the database and commit changes.
         """
-        decision_time = (datetime.utcnow() - start_time).total_seconds() * 1000  # in ms
+        decision_time = (time.monotonic_ns() - start_ns) / 1e6  # in ms
         
         # Handle failed attempts on known cards
         if not status.is_success() and card:
-            card.record_failed_attempt()
+            card.record_failed_attempt(now)
+
+        log_fields = dict(
+            uid=uid,
+            status=status,
+            user_id=card.user_id if card else None,
+            card_id=card.id if card else None,
+            zone_id=zone.id if zone else None,
+            reason=reason,
+            device_id=device_id,
+            timestamp=now,
+            decision_time_ms=decision_time,
+            is_entry=True # Assuming entry tap; exit logic requires another parameter or state check
+        )
 
-        # Create Access Log using the built-in class method
         try:
-            log_entry = AccessLog.create_log(
-                session=self.session,
-                uid=uid,
-                status=status,
-                user_id=card.user_id if card else None,
-                card_id=card.id if card else None,
-                zone_id=zone.id if zone else None,
-                reason=reason,
-                device_id=device_id,
-                decision_time_ms=decision_time,
-                is_entry=True # Assuming entry tap; exit logic requires another parameter or state check
-            )
+            if self.log_writer is not None:
+                # Queue the log for the batch writer; only entity counters are committed here
+                log_row = AccessLog.log_row(**log_fields)
+                self.log_writer.submit(log_row)
+                log_id = log_row["id"]
+            else:
+                # Plain INSERT on the session's connection, committed together with the counters
+                log_id = AccessLog.create_log_fast(self.session.connection(), **log_fields)
             
             # Commit all changes (Logs, Card usage, Zone occupancy)
             self.session.commit()
@@ -153,7 +269,7 @@ class NFCHandler:
                 "success": status.is_success(),
                 "status": status.value,
                 "message": reason,
-                "log_id": log_entry.id,
+                "log_id": str(log_id),
                 "user": card.user.full_name if card and card.user else "Unknown"
             }
             
@@ -164,11 +280,7 @@ class NFCHandler:
 
     def _map_reason_to_status(self, reason: str, card: Card) -> AccessStatus:
         """Helper to map string reasons from model validation to Enums."""
-        reason_lower = reason.lower()
-        if "expired" in reason_lower:
-            return AccessStatus.EXPIRED
-        elif "suspended" in reason_lower or "lost" in reason_lower or "stolen" in reason_lower:
-            return AccessStatus.BLACKLISTED
-        elif "inactive" in reason_lower:
-            return AccessStatus.INACTIVE
+        match = _REASON_RE.search(reason)
+        if match:
+            return _REASON_STATUSES[match.lastindex - 1]
         return AccessStatus.DENIED
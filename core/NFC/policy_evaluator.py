@@ -0,0 +1,94 @@
+"""
+Compiled Policy Evaluator
+Path: core/NFC/policy_evaluator.py
+
+Turns the active AccessPolicy rows of a zone into one plain-Python decision
+function, so the tap hot path does no ORM attribute access, association
+queries or time parsing.
+"""
+
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from core.database.corefiles.enums import PolicyType
+from core.database.modelsfiles.access_policy import AccessPolicy
+from core.database.modelsfiles.user import User
+
+Decision = Callable[[User, datetime], Tuple[bool, str]]
+
+
+def _allow_all(user: User, now: datetime) -> Tuple[bool, str]:
+    return True, "No active policies"
+
+
+class PolicyEvaluator:
+    """
+    Compiles a zone's policies into a decide(user, now) -> (allowed, reason)
+    closure with the same outcome as calling AccessPolicy.check_access on each
+    active policy, highest priority first, and stopping at the first denial.
+
+    The result is a snapshot: recompile whenever a policy of the zone changes
+    (HandlerCache evicts compiled evaluators on every AccessPolicy write).
+    """
+
+    @staticmethod
+    def compile(policies: List[AccessPolicy]) -> Decision:
+        """
+        Args:
+            policies: Policies of a single zone (inactive ones are skipped).
+
+        Returns:
+            Callable: decide(user, now) returning (access_allowed, reason).
+        """
+        active = sorted((p for p in policies if p.is_active), key=lambda p: p.priority, reverse=True)
+        rules = tuple(PolicyEvaluator._compile_rule(policy) for policy in active)
+        if not rules:
+            return _allow_all
+
+        to_local = AccessPolicy.local_time
+
+        def decide(user: User, now: datetime) -> Tuple[bool, str]:
+            local = to_local(now)
+            weekday_bit = 1 << local.isoweekday()
+            minute = local.hour * 60 + local.minute
+            if user:
+                user_id, role = user.id, user.role.value
+
+            for valid_from, valid_until, days_mask, start, span, blacklist, whitelist, allowed, denied in rules:
+                # Policies outside their validity period allow access
+                if valid_from is not None and now < valid_from or valid_until is not None and now > valid_until:
+                    continue
+
+                if start is not None:
+                    if days_mask and not days_mask & weekday_bit or (minute - start) % 1440 > span:
+                        return False, "Outside allowed time"
+
+                if not user:
+                    continue
+                if user_id in blacklist:
+                    return False, "User is blacklisted"
+                if whitelist is not None and user_id not in whitelist:
+                    return False, "User not in whitelist"
+                if role in denied or allowed and role not in allowed:
+                    return False, f"Role '{role}' not allowed"
+
+            return True, "Policy check passed"
+
+        return decide
+
+    @staticmethod
+    def _compile_rule(policy: AccessPolicy) -> tuple:
+        """Resolve one policy into plain values (loads its association sets once)"""
+        allowed, denied = policy.get_role_restrictions()
+        time_restricted = policy.is_time_restricted
+        return (
+            policy.valid_from,
+            policy.valid_until,
+            policy.days_mask,
+            policy.time_start_min if time_restricted else None,
+            (policy.time_end_min - policy.time_start_min) % 1440 if time_restricted else None,  # window length
+            frozenset(policy.get_blacklist()),
+            frozenset(policy.get_whitelist()) if policy.policy_type == PolicyType.WHITELIST else None,
+            allowed,
+            denied,
+        )
@@ -2,8 +2,7 @@
 Database Association Tables
 Many-to-Many relationship tables for the NFC Access Control System
 """
-from sqlalchemy import Table, Column, Integer, String, ForeignKey, DateTime, Boolean
-from datetime import datetime
+from sqlalchemy import Table, Column, Integer, String, ForeignKey, DateTime, Boolean, Index, func
 from .base import Base
 
 
@@ -15,13 +14,17 @@ user_zone_association = Table(
     'user_zone_association',
     Base.metadata,
     Column('id', Integer, primary_key=True, autoincrement=True),
-    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True),
-    Column('zone_id', Integer, ForeignKey('zones.id', ondelete='CASCADE'), nullable=False, index=True),
-    Column('granted_at', DateTime, default=datetime.utcnow, nullable=False),
-    Column('granted_by', Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True),
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+    Column('zone_id', Integer, ForeignKey('zones.id', ondelete='CASCADE'), nullable=False),
+    Column('granted_at', DateTime(timezone=True), server_default=func.now(), nullable=False),
+    Column('granted_by', Integer, nullable=True),  # audit only: users.id of the grantor, not enforced
     Column('expires_at', DateTime, nullable=True),
     Column('is_active', Boolean, default=True, nullable=False),
-    Column('notes', String(255), nullable=True)
+    Column('notes', String(255), nullable=True),
+    # Read paths: "does user X hold an active grant for zone Y" and the zone-side
+    # "is user X in zone Y"; their leading columns also serve user_id / zone_id lookups
+    Index('ix_user_zone_association_lookup', 'user_id', 'zone_id', 'is_active'),
+    Index('ix_user_zone_association_zone_user', 'zone_id', 'user_id'),
 )
 
 
@@ -35,7 +38,7 @@ card_zone_association = Table(
     Column('id', Integer, primary_key=True, autoincrement=True),
     Column('card_id', Integer, ForeignKey('cards.id', ondelete='CASCADE'), nullable=False, index=True),
     Column('zone_id', Integer, ForeignKey('zones.id', ondelete='CASCADE'), nullable=False, index=True),
-    Column('granted_at', DateTime, default=datetime.utcnow, nullable=False),
+    Column('granted_at', DateTime(timezone=True), server_default=func.now(), nullable=False),
     Column('expires_at', DateTime, nullable=True),
     Column('priority', Integer, default=0, nullable=False)
 )
@@ -52,7 +55,7 @@ zone_policy_association = Table(
     Column('zone_id', Integer, ForeignKey('zones.id', ondelete='CASCADE'), nullable=False, index=True),
     Column('policy_id', Integer, ForeignKey('access_policies.id', ondelete='CASCADE'), nullable=False, index=True),
     Column('is_active', Boolean, default=True, nullable=False),
-    Column('created_at', DateTime, default=datetime.utcnow, nullable=False)
+    Column('created_at', DateTime(timezone=True), server_default=func.now(), nullable=False)
 )
 
 
@@ -67,7 +70,39 @@ user_policy_association = Table(
     Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True),
     Column('policy_id', Integer, ForeignKey('access_policies.id', ondelete='CASCADE'), nullable=False, index=True),
     Column('is_override', Boolean, default=False, nullable=False),
-    Column('created_at', DateTime, default=datetime.utcnow, nullable=False)
+    Column('created_at', DateTime(timezone=True), server_default=func.now(), nullable=False)
+)
+
+
+# ============================================================================
+# Policy Whitelist / Blacklist
+# Users explicitly allowed or denied by an access policy
+# ============================================================================
+policy_whitelist_association = Table(
+    'policy_whitelist_association',
+    Base.metadata,
+    Column('policy_id', Integer, ForeignKey('access_policies.id', ondelete='CASCADE'), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, index=True)
+)
+
+policy_blacklist_association = Table(
+    'policy_blacklist_association',
+    Base.metadata,
+    Column('policy_id', Integer, ForeignKey('access_policies.id', ondelete='CASCADE'), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True, index=True)
+)
+
+
+# ============================================================================
+# Policy-Role Association
+# Roles allowed (is_allowed=True) or denied (is_allowed=False) by a policy
+# ============================================================================
+policy_role_association = Table(
+    'policy_role_association',
+    Base.metadata,
+    Column('policy_id', Integer, ForeignKey('access_policies.id', ondelete='CASCADE'), primary_key=True),
+    Column('role', String(20), primary_key=True),
+    Column('is_allowed', Boolean, primary_key=True)
 )
 
 
@@ -79,4 +114,7 @@ __all__ = [
     'card_zone_association',
     'zone_policy_association',
     'user_policy_association',
+    'policy_whitelist_association',
+    'policy_blacklist_association',
+    'policy_role_association',
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column , Integer  , DateTime
+from sqlalchemy import Column , Integer  , DateTime , func
 from sqlalchemy.ext.declarative import declarative_base , declared_attr
 from sqlalchemy import MetaData
 
@@ -19,9 +19,9 @@ Base = declarative_base(metadata=metadata)
 
 # Mixins
 class TimestampMixin:
-    
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Filled in by the database, not by Python, on every INSERT/UPDATE
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
 class PrimaryKeyMixin:
 
@@ -30,6 +30,8 @@ class PrimaryKeyMixin:
 class BaseModel(Base, PrimaryKeyMixin, TimestampMixin):
     
     __abstract__ = True  
+    # Fetch server-generated timestamps in the INSERT itself (RETURNING) rather than lazily later
+    __mapper_args__ = {"eager_defaults": True}
 
 class SoftDeleteMixin: 
     deleted_at = Column(DateTime, nullable=True, default=None)
@@ -0,0 +1,77 @@
+"""
+Request-Scoped Clock
+One reading of the current UTC time shared by every time check made while
+serving a request (see freeze_now / run.create_app)
+"""
+import time
+from contextvars import ContextVar, Token
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+# (datetime, epoch nanoseconds) of the frozen reading
+_now_ctx: ContextVar[Optional[Tuple[datetime, int]]] = ContextVar('frozen_utcnow', default=None)
+
+
+def utcnow() -> datetime:
+    """Current naive UTC time, or the frozen value while a request is being served"""
+    frozen = _now_ctx.get()
+    return frozen[0] if frozen is not None else datetime.utcnow()
+
+
+def utcnow_ns() -> int:
+    """utcnow() as integer nanoseconds since the Unix epoch"""
+    frozen = _now_ctx.get()
+    return frozen[1] if frozen is not None else time.time_ns()
+
+
+def to_epoch_ns(value: datetime) -> int:
+    """Naive UTC datetime -> integer nanoseconds since the Unix epoch"""
+    return (value - _EPOCH) // _ONE_MICROSECOND * 1000
+
+
+def parse_minutes(value: str) -> int:
+    """'HH:MM' -> minutes since midnight"""
+    hours, minutes = value.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def format_minutes(value: int) -> str:
+    """Minutes since midnight -> 'HH:MM' (None stays None)"""
+    if value is None:
+        return None
+    return f"{value // 60:02d}:{value % 60:02d}"
+
+
+def in_minute_window(minute: int, start: int, end: int) -> bool:
+    """
+    Inclusive start..end check on minutes since midnight. Offsets from start are
+    taken modulo one day, so an overnight window (start > end) needs no extra branch.
+    """
+    return (minute - start) % 1440 <= (end - start) % 1440
+
+
+def freeze_now(now: datetime = None) -> Token:
+    """Pin utcnow()/utcnow_ns() for the current context; pass the token to unfreeze_now"""
+    now = now or datetime.utcnow()
+    return _now_ctx.set((now, to_epoch_ns(now)))
+
+
+def unfreeze_now(token: Token):
+    """Undo a freeze_now"""
+    _now_ctx.reset(token)
+
+
+__all__ = [
+    'utcnow',
+    'utcnow_ns',
+    'to_epoch_ns',
+    'parse_minutes',
+    'format_minutes',
+    'in_minute_window',
+    'freeze_now',
+    'unfreeze_now',
+]
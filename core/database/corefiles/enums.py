@@ -1,5 +1,6 @@
 from enum import Enum
-from typing import List
+from types import MappingProxyType
+from typing import FrozenSet, List
 
 
 # Access Status 
@@ -16,36 +17,41 @@ class AccessStatus(str, Enum):
     INVALID_CARD = "invalid_card"    
     
     @classmethod
-    def success_statuses(cls) -> List['AccessStatus']:
+    def success_statuses(cls) -> FrozenSet['AccessStatus']:
        
-        return [cls.GRANTED]
+        return _SUCCESS_STATUSES
     
     @classmethod
-    def failure_statuses(cls) -> List['AccessStatus']:
+    def failure_statuses(cls) -> FrozenSet['AccessStatus']:
       
-        return [
-            cls.DENIED, cls.EXPIRED, cls.BLACKLISTED,
-            cls.INACTIVE, cls.INVALID_TIME, cls.INVALID_ZONE,
-            cls.INVALID_CARD
-        ]
+        return _FAILURE_STATUSES
     
     def is_success(self) -> bool:
       
-        return self == self.GRANTED
+        return self is AccessStatus.GRANTED
     
     def get_persian_name(self) -> str:
         
-        persian_names = {
-            self.GRANTED: "دسترسی مجاز",
-            self.DENIED: "دسترسی رد شده",
-            self.EXPIRED: "کارت منقضی",
-            self.BLACKLISTED: "لیست سیاه",
-            self.INACTIVE: "غیرفعال",
-            self.INVALID_TIME: "زمان نامعتبر",
-            self.INVALID_ZONE: "زون نامعتبر",
-            self.INVALID_CARD: "کارت نامعتبر"
-        }
-        return persian_names.get(self, self.value)
+        return _ACCESS_STATUS_PERSIAN.get(self, self.value)
+
+
+# Lookup tables are built once here instead of on every call
+_SUCCESS_STATUSES = frozenset((AccessStatus.GRANTED,))
+_FAILURE_STATUSES = frozenset((
+    AccessStatus.DENIED, AccessStatus.EXPIRED, AccessStatus.BLACKLISTED,
+    AccessStatus.INACTIVE, AccessStatus.INVALID_TIME, AccessStatus.INVALID_ZONE,
+    AccessStatus.INVALID_CARD
+))
+_ACCESS_STATUS_PERSIAN = MappingProxyType({
+    AccessStatus.GRANTED: "دسترسی مجاز",
+    AccessStatus.DENIED: "دسترسی رد شده",
+    AccessStatus.EXPIRED: "کارت منقضی",
+    AccessStatus.BLACKLISTED: "لیست سیاه",
+    AccessStatus.INACTIVE: "غیرفعال",
+    AccessStatus.INVALID_TIME: "زمان نامعتبر",
+    AccessStatus.INVALID_ZONE: "زون نامعتبر",
+    AccessStatus.INVALID_CARD: "کارت نامعتبر"
+})
 
 
 
@@ -64,32 +70,36 @@ class CardStatus(str, Enum):
     PENDING = "pending"       
     
     @classmethod
-    def active_statuses(cls) -> List['CardStatus']:
+    def active_statuses(cls) -> FrozenSet['CardStatus']:
       
-        return [cls.ACTIVE]
+        return _ACTIVE_CARD_STATUSES
     
     @classmethod
-    def blocked_statuses(cls) -> List['CardStatus']:
+    def blocked_statuses(cls) -> FrozenSet['CardStatus']:
       
-        return [cls.LOST, cls.STOLEN, cls.SUSPENDED]
+        return _BLOCKED_CARD_STATUSES
     
     def is_usable(self) -> bool:
       
-        return self == self.ACTIVE
+        return self is CardStatus.ACTIVE
     
     def get_persian_name(self) -> str:
        
-        persian_names = {
-            self.ACTIVE: "فعال",
-            self.INACTIVE: "غیرفعال",
-            self.SUSPENDED: "معلق",
-            self.EXPIRED: "منقضی",
-            self.LOST: "گم شده",
-            self.STOLEN: "سرقت شده",
-            self.DAMAGED: "آسیب دیده",
-            self.PENDING: "در انتظار"
-        }
-        return persian_names.get(self, self.value)
+        return _CARD_STATUS_PERSIAN.get(self, self.value)
+
+
+_ACTIVE_CARD_STATUSES = frozenset((CardStatus.ACTIVE,))
+_BLOCKED_CARD_STATUSES = frozenset((CardStatus.LOST, CardStatus.STOLEN, CardStatus.SUSPENDED))
+_CARD_STATUS_PERSIAN = MappingProxyType({
+    CardStatus.ACTIVE: "فعال",
+    CardStatus.INACTIVE: "غیرفعال",
+    CardStatus.SUSPENDED: "معلق",
+    CardStatus.EXPIRED: "منقضی",
+    CardStatus.LOST: "گم شده",
+    CardStatus.STOLEN: "سرقت شده",
+    CardStatus.DAMAGED: "آسیب دیده",
+    CardStatus.PENDING: "در انتظار"
+})
 
 
 
@@ -108,50 +118,55 @@ class UserRole(str, Enum):
     GUEST = "guest"              
     
     @classmethod
-    def admin_roles(cls) -> List['UserRole']:
+    def admin_roles(cls) -> FrozenSet['UserRole']:
        
-        return [cls.SUPER_ADMIN, cls.ADMIN]
+        return _ADMIN_ROLES
     
     @classmethod
-    def staff_roles(cls) -> List['UserRole']:
+    def staff_roles(cls) -> FrozenSet['UserRole']:
         
-        return [cls.MANAGER, cls.EMPLOYEE, cls.SECURITY]
+        return _STAFF_ROLES
     
     @classmethod
-    def temporary_roles(cls) -> List['UserRole']:
+    def temporary_roles(cls) -> FrozenSet['UserRole']:
         
-        return [cls.VISITOR, cls.CONTRACTOR, cls.GUEST]
+        return _TEMPORARY_ROLES
     
     def get_priority_level(self) -> int:
         
-        priority_map = {
-            self.SUPER_ADMIN: 100,
-            self.ADMIN: 90,
-            self.MANAGER: 70,
-            self.SECURITY: 60,
-            self.EMPLOYEE: 50,
-            self.CONTRACTOR: 30,
-            self.VISITOR: 20,
-            self.GUEST: 10
-        }
-        return priority_map.get(self, 0)
+        return _ROLE_PRIORITY.get(self, 0)
     
     def is_admin(self) -> bool:
        
-        return self in self.admin_roles()
+        return self in _ADMIN_ROLES
     
     def get_persian_name(self) -> str:
-        persian_names = {
-            self.SUPER_ADMIN: "مدیر ارشد",
-            self.ADMIN: "مدیر سیستم",
-            self.MANAGER: "مدیر",
-            self.EMPLOYEE: "کارمند",
-            self.VISITOR: "بازدیدکننده",
-            self.CONTRACTOR: "پیمانکار",
-            self.SECURITY: "نگهبان",
-            self.GUEST: "مهمان"
-        }
-        return persian_names.get(self, self.value)
+        return _USER_ROLE_PERSIAN.get(self, self.value)
+
+
+_ADMIN_ROLES = frozenset((UserRole.SUPER_ADMIN, UserRole.ADMIN))
+_STAFF_ROLES = frozenset((UserRole.MANAGER, UserRole.EMPLOYEE, UserRole.SECURITY))
+_TEMPORARY_ROLES = frozenset((UserRole.VISITOR, UserRole.CONTRACTOR, UserRole.GUEST))
+_ROLE_PRIORITY = MappingProxyType({
+    UserRole.SUPER_ADMIN: 100,
+    UserRole.ADMIN: 90,
+    UserRole.MANAGER: 70,
+    UserRole.SECURITY: 60,
+    UserRole.EMPLOYEE: 50,
+    UserRole.CONTRACTOR: 30,
+    UserRole.VISITOR: 20,
+    UserRole.GUEST: 10
+})
+_USER_ROLE_PERSIAN = MappingProxyType({
+    UserRole.SUPER_ADMIN: "مدیر ارشد",
+    UserRole.ADMIN: "مدیر سیستم",
+    UserRole.MANAGER: "مدیر",
+    UserRole.EMPLOYEE: "کارمند",
+    UserRole.VISITOR: "بازدیدکننده",
+    UserRole.CONTRACTOR: "پیمانکار",
+    UserRole.SECURITY: "نگهبان",
+    UserRole.GUEST: "مهمان"
+})
 
 
 # Policy Type 
@@ -168,16 +183,18 @@ class PolicyType(str, Enum):
     
     def get_persian_name(self) -> str:
       
-        persian_names = {
-            self.WHITELIST: "لیست سفید",
-            self.BLACKLIST: "لیست سیاه",
-            self.TIME_BASED: "زمان‌بندی شده",
-            self.ROLE_BASED: "مبتنی بر نقش",
-            self.ZONE_BASED: "مبتنی بر زون",
-            self.LEVEL_BASED: "مبتنی بر سطح",
-            self.CUSTOM: "سفارشی"
-        }
-        return persian_names.get(self, self.value)
+        return _POLICY_TYPE_PERSIAN.get(self, self.value)
+
+
+_POLICY_TYPE_PERSIAN = MappingProxyType({
+    PolicyType.WHITELIST: "لیست سفید",
+    PolicyType.BLACKLIST: "لیست سیاه",
+    PolicyType.TIME_BASED: "زمان‌بندی شده",
+    PolicyType.ROLE_BASED: "مبتنی بر نقش",
+    PolicyType.ZONE_BASED: "مبتنی بر زون",
+    PolicyType.LEVEL_BASED: "مبتنی بر سطح",
+    PolicyType.CUSTOM: "سفارشی"
+})
 
 
 
@@ -197,17 +214,19 @@ class DeviceType(str, Enum):
 
     def get_persian_name(self) -> str:
         """دریافت نام فارسی نوع دستگاه"""
-        persian_names = {
-            self.READER_RFID: "خواننده RFID",
-            self.READER_NFC: "خواننده NFC",
-            self.MOBILE_APP: "اپلیکیشن موبایل",
-            self.WEB_INTERFACE: "رابط وب",
-            self.TURNSTILE: "گردان",
-            self.GATE: "گیت",
-            self.DOOR_LOCK: "قفل درب",
-            self.SIMULATED: "شبیه‌سازی"
-        }
-        return persian_names.get(self, self.value)
+        return _DEVICE_TYPE_PERSIAN.get(self, self.value)
+
+
+_DEVICE_TYPE_PERSIAN = MappingProxyType({
+    DeviceType.READER_RFID: "خواننده RFID",
+    DeviceType.READER_NFC: "خواننده NFC",
+    DeviceType.MOBILE_APP: "اپلیکیشن موبایل",
+    DeviceType.WEB_INTERFACE: "رابط وب",
+    DeviceType.TURNSTILE: "گردان",
+    DeviceType.GATE: "گیت",
+    DeviceType.DOOR_LOCK: "قفل درب",
+    DeviceType.SIMULATED: "شبیه‌سازی"
+})
 
 
 
@@ -223,26 +242,30 @@ class DayOfWeek(int, Enum):
     SUNDAY = 7      
     
     @classmethod
-    def weekdays(cls) -> List['DayOfWeek']:
+    def weekdays(cls) -> FrozenSet['DayOfWeek']:
        
-        return [cls.SATURDAY, cls.SUNDAY, cls.MONDAY, cls.TUESDAY, cls.WEDNESDAY]
+        return _WEEKDAYS
     
     @classmethod
-    def weekend(cls) -> List['DayOfWeek']:
+    def weekend(cls) -> FrozenSet['DayOfWeek']:
 
-        return [cls.THURSDAY, cls.FRIDAY]
+        return _WEEKEND
     
     def get_persian_name(self) -> str:
-        persian_names = {
-            self.MONDAY: "دوشنبه",
-            self.TUESDAY: "سه‌شنبه",
-            self.WEDNESDAY: "چهارشنبه",
-            self.THURSDAY: "پنج‌شنبه",
-            self.FRIDAY: "جمعه",
-            self.SATURDAY: "شنبه",
-            self.SUNDAY: "یکشنبه"
-        }
-        return persian_names.get(self, str(self.value))
+        return _DAY_OF_WEEK_PERSIAN.get(self, str(self.value))
+
+
+_WEEKDAYS = frozenset((DayOfWeek.SATURDAY, DayOfWeek.SUNDAY, DayOfWeek.MONDAY, DayOfWeek.TUESDAY, DayOfWeek.WEDNESDAY))
+_WEEKEND = frozenset((DayOfWeek.THURSDAY, DayOfWeek.FRIDAY))
+_DAY_OF_WEEK_PERSIAN = MappingProxyType({
+    DayOfWeek.MONDAY: "دوشنبه",
+    DayOfWeek.TUESDAY: "سه‌شنبه",
+    DayOfWeek.WEDNESDAY: "چهارشنبه",
+    DayOfWeek.THURSDAY: "پنج‌شنبه",
+    DayOfWeek.FRIDAY: "جمعه",
+    DayOfWeek.SATURDAY: "شنبه",
+    DayOfWeek.SUNDAY: "یکشنبه"
+})
 
 
 
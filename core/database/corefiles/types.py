@@ -0,0 +1,117 @@
+"""
+Custom Column Types
+Compact storage types shared by the models of the NFC Access Control System
+"""
+import json
+import os
+import time
+import uuid
+import zlib
+from enum import Enum
+from typing import Type
+
+from sqlalchemy import SmallInteger, LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import zstandard
+except ImportError:  # optional: fall back to zlib for new values
+    zstandard = None
+
+
+def uuid7_at(unix_ms: int) -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7): 48-bit Unix ms timestamp + random bits"""
+    value = unix_ms << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 9562 variant
+    return uuid.UUID(int=value)
+
+
+try:
+    from uuid import uuid7  # Python 3.14+
+except ImportError:
+    def uuid7() -> uuid.UUID:
+        """UUIDv7 for the current time"""
+        return uuid7_at(time.time_ns() // 1_000_000)
+
+
+# ============================================================================
+# Enum stored as a small integer code
+# Codes follow member definition order starting at 1, so new members must be
+# appended to the end of the enum and existing members never reordered.
+# ============================================================================
+class EnumCode(TypeDecorator):
+    """Persist an Enum as a SMALLINT code and load it back as the Enum member"""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class: Type[Enum], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.enum_class = enum_class
+        self._codes = {member: code for code, member in enumerate(enum_class, start=1)}
+        self._members = {code: member for member, code in self._codes.items()}
+
+    def code(self, member: Enum) -> int:
+        """Integer code stored for a member (useful for raw SQL such as index predicates)"""
+        return self._codes[member]
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self._codes[self.enum_class(value)]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._members[value]
+
+    def copy(self, **kwargs):
+        return EnumCode(self.enum_class)
+
+
+# ============================================================================
+# JSON stored as a compressed blob
+# Every value starts with a one-byte codec tag, so rows written with zstd and
+# rows written with the zlib fallback can live side by side.
+# ============================================================================
+_ZSTD_TAG = b'Z'
+_ZLIB_TAG = b'D'
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    Persist a JSON-serializable value as zstd (level 3) or zlib compressed bytes.
+    Mutating the loaded value in place is not tracked; assign a new value instead.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        raw = json.dumps(value, separators=(',', ':')).encode()
+        if zstandard is not None:
+            return _ZSTD_TAG + zstandard.ZstdCompressor(level=3).compress(raw)
+        return _ZLIB_TAG + zlib.compress(raw)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        tag, payload = value[:1], value[1:]
+        if tag == _ZSTD_TAG:
+            if zstandard is None:
+                raise RuntimeError("zstd-compressed value found but 'zstandard' is not installed")
+            raw = zstandard.ZstdDecompressor().decompress(payload)
+        else:
+            raw = zlib.decompress(payload)
+        return json.loads(raw)
+
+
+__all__ = [
+    'CompressedJSON',
+    'EnumCode',
+    'uuid7',
+    'uuid7_at',
+]
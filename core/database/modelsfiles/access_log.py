@@ -4,12 +4,21 @@ AccessLog Model
 Records all access attempts for audit and security
 """
 from datetime import datetime, timedelta
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Float
-from sqlalchemy import Enum as SQLEnum
-from sqlalchemy.orm import relationship, Session
+import itertools
+import logging
+import uuid
+from typing import Iterable, List, Optional
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Float, Uuid
+from sqlalchemy import Index, DDL, Connection, event, insert, select, update, func, text, cast, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, selectinload, Session
 
 from core.database.corefiles.base import Base
+from core.database.corefiles.clock import utcnow
 from core.database.corefiles.enums import AccessStatus
+from core.database.corefiles.types import CompressedJSON, EnumCode, uuid7
+
+logger = logging.getLogger(__name__)
 
 
 class AccessLog(Base):
@@ -18,18 +27,29 @@ class AccessLog(Base):
     Records every access attempt (successful and failed) for audit trail
     """
     __tablename__ = 'access_logs'
+    __table_args__ = (
+        # "WHERE <col> = ? ORDER BY timestamp DESC LIMIT n" becomes one descending index range scan
+        Index('ix_access_logs_user_ts', 'user_id', text('timestamp DESC')),
+        Index('ix_access_logs_zone_ts', 'zone_id', text('timestamp DESC')),
+        Index('ix_access_logs_status_ts', 'status', text('timestamp DESC')),
+        Index('ix_access_logs_suspicious_ts', 'is_suspicious', text('timestamp DESC')),
+        # Newest-first keyset pages: ORDER BY timestamp DESC, id DESC after a (timestamp, id) cursor
+        Index('ix_access_logs_ts_id', text('timestamp DESC'), text('id DESC')),
+        # PostgreSQL: monthly range partitions (see ensure_partitions); ignored elsewhere
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
 
-    # Primary Key
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Primary Key (UUIDv7: generated client-side, time-ordered so inserts stay append-only)
+    id = Column(Uuid, primary_key=True, default=uuid7)
     
     # Relationships (nullable for unknown/invalid attempts)
-    user_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
     card_id = Column(Integer, ForeignKey('cards.id', ondelete='SET NULL'), nullable=True, index=True)
-    zone_id = Column(Integer, ForeignKey('zones.id', ondelete='SET NULL'), nullable=True, index=True)
+    zone_id = Column(Integer, ForeignKey('zones.id', ondelete='SET NULL'), nullable=True)
     
     # Access Attempt Details
     uid_attempted = Column(String(255), nullable=False, index=True)
-    status = Column(SQLEnum(AccessStatus), nullable=False, index=True)
+    status = Column(EnumCode(AccessStatus), nullable=False)
     
     # Entry/Exit Tracking
     is_entry = Column(Boolean, default=True, nullable=False)
@@ -54,18 +74,23 @@ class AccessLog(Base):
     policy_id = Column(Integer, nullable=True)
     policy_applied = Column(String(100), nullable=True)
     
-    # Timestamp
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # Timestamp (part of the table's primary key because it is the partition key;
+    # indexed through ix_access_logs_ts_id)
+    timestamp = Column(DateTime, default=datetime.utcnow, primary_key=True)
     
     # Security Flags
-    is_suspicious = Column(Boolean, default=False, nullable=False, index=True)
+    is_suspicious = Column(Boolean, default=False, nullable=False)
     is_emergency_override = Column(Boolean, default=False, nullable=False)
     alert_triggered = Column(Boolean, default=False, nullable=False)
     
-    # Metadata (JSON stored as text)
-    metadata_json = Column("metadata", Text, nullable=True)
+    # Metadata (JSON value; JSONB on PostgreSQL, whose TOAST compresses it,
+    # compressed bytes elsewhere)
+    metadata_json = Column("metadata", CompressedJSON().with_variant(JSONB(), 'postgresql'), nullable=True)
     notes = Column(Text, nullable=True)
     
+    # The ORM still identifies a log by id alone
+    __mapper_args__ = {'primary_key': [id]}
+    
     # Relationships
     user = relationship("User", back_populates="access_logs")
     card = relationship("Card", back_populates="access_logs")
@@ -94,11 +119,15 @@ class AccessLog(Base):
     @property
     def time_in_zone(self) -> str:
         """Get formatted time spent in zone"""
-        if not self.exit_time or not self.duration_seconds:
-            return "Still inside" if self.is_entry else "N/A"
+        return self._format_time_in_zone(self.exit_time, self.duration_seconds, self.is_entry)
+    
+    @staticmethod
+    def _format_time_in_zone(exit_time: datetime, duration_seconds: int, is_entry: bool) -> str:
+        if not exit_time or not duration_seconds:
+            return "Still inside" if is_entry else "N/A"
         
-        hours = self.duration_seconds // 3600
-        minutes = (self.duration_seconds % 3600) // 60
+        hours = duration_seconds // 3600
+        minutes = (duration_seconds % 3600) // 60
         
         if hours > 0:
             return f"{hours}h {minutes}m"
@@ -107,13 +136,20 @@ class AccessLog(Base):
     @property
     def is_recent(self) -> bool:
         """Check if log is from last 24 hours"""
-        return (datetime.utcnow() - self.timestamp) < timedelta(hours=24)
+        return self.is_recent_at(utcnow())
     
     @property
     def age_in_hours(self) -> float:
         """Get age of log entry in hours"""
-        delta = datetime.utcnow() - self.timestamp
-        return delta.total_seconds() / 3600
+        return self.age_in_hours_at(utcnow())
+    
+    def is_recent_at(self, now: datetime) -> bool:
+        """is_recent against a caller-supplied clock (resolve now once when scanning many logs)"""
+        return (now - self.timestamp) < timedelta(hours=24)
+    
+    def age_in_hours_at(self, now: datetime) -> float:
+        """age_in_hours against a caller-supplied clock"""
+        return (now - self.timestamp).total_seconds() / 3600
     
     # Class Methods
     
@@ -138,7 +174,23 @@ class AccessLog(Base):
         Returns:
             AccessLog: Created log entry
         """
-        log = cls(
+        log = cls(**cls.log_row(uid, status, user_id, card_id, zone_id, reason, device_id, **kwargs))
+        session.add(log)
+        return log
+    
+    @classmethod
+    def log_row(cls, uid: str, status: AccessStatus,
+                user_id: int = None, card_id: int = None, zone_id: int = None,
+                reason: str = None, device_id: str = None, timestamp: datetime = None, **kwargs) -> dict:
+        """
+        Build the column values for a new log entry without creating an ORM object
+        (used by create_log and by batch writers)
+        
+        Returns:
+            dict: Attribute name -> value
+        """
+        return dict(
+            id=uuid7(),
             uid_attempted=uid,
             status=status,
             user_id=user_id,
@@ -146,56 +198,234 @@ class AccessLog(Base):
             zone_id=zone_id,
             reason=reason,
             device_id=device_id,
-            timestamp=datetime.utcnow(),
+            timestamp=timestamp or utcnow(),
             **kwargs
         )
-        session.add(log)
-        return log
     
     @classmethod
-    def get_failed_attempts(cls, session: Session, hours: int = 24, limit: int = 100):
+    def create_log_fast(cls, conn: Connection, uid: str, status: AccessStatus, **fields) -> uuid.UUID:
+        """
+        Insert one log entry with a Core INSERT, skipping the ORM unit of work
+        (identity map, history tracking, flush). Transaction handling is the
+        caller's: pass session.connection() to join a session's transaction, or an
+        AUTOCOMMIT connection for standalone audit inserts.
+        
+        Args:
+            conn: Database connection
+            uid: Card UID that was attempted
+            status: AccessStatus enum
+            **fields: Any other log_row() arguments
+            
+        Returns:
+            UUID: ID of the inserted log
+        """
+        row = cls.log_row(uid, status, **fields)
+        columns = cls.__mapper__.columns
+        conn.execute(cls.__table__.insert(), {columns[key].key: value for key, value in row.items()})
+        return row['id']
+    
+    @classmethod
+    def bulk_create_logs(cls, session: Session, rows: Iterable[dict], batch_size: int = 1000) -> List[uuid.UUID]:
+        """
+        Insert many log entries without building ORM objects (imports, replays, batch writers)
+        
+        Args:
+            session: Database session (the caller commits)
+            rows: Dicts keyed by attribute name, e.g. from log_row()
+            batch_size: Rows sent per executemany round-trip
+            
+        Returns:
+            list: IDs of the inserted logs, in input order
+        """
+        ids = []
+        rows = iter(rows)
+        while True:
+            # Copies, so the caller's dicts never pick up ids (a retried batch gets fresh ones);
+            # ids are generated here, so RETURNING is never needed
+            batch = [{**row, 'id': row.get('id') or uuid7()} for row in itertools.islice(rows, batch_size)]
+            if not batch:
+                return ids
+            ids.extend(row['id'] for row in batch)
+            session.execute(insert(cls), batch)
+    
+    @classmethod
+    def record_exits(cls, session: Session, log_ids: Iterable[uuid.UUID], now: datetime = None) -> int:
+        """
+        Bulk counterpart of record_exit: close many open entries in one UPDATE,
+        with duration_seconds computed by the database (the caller commits)
+        
+        Returns:
+            int: Number of logs updated
+        """
+        now = now or datetime.utcnow()
+        result = session.execute(
+            update(cls)
+            .where(cls.id.in_(list(log_ids)), cls.is_entry.is_(True), cls.exit_time.is_(None))
+            .values(exit_time=now, duration_seconds=cls._seconds_since(session.get_bind().dialect.name, now))
+        )
+        return result.rowcount
+    
+    @staticmethod
+    def _seconds_since(dialect_name: str, now: datetime):
+        """Dialect-specific whole seconds from the log timestamp to now"""
+        if dialect_name == 'postgresql':
+            seconds = func.extract('epoch', now - AccessLog.timestamp)
+        elif dialect_name == 'sqlite':
+            seconds = (func.julianday(now) - func.julianday(AccessLog.timestamp)) * 86400
+        else:  # MySQL / MariaDB
+            seconds = func.timestampdiff(text('SECOND'), AccessLog.timestamp, now)
+        return cast(seconds, Integer)
+    
+    @classmethod
+    def ensure_partitions(cls, connection: Connection, now: datetime = None, months_ahead: int = 1,
+                          since: datetime = None) -> List[str]:
+        """
+        Create the monthly partitions from the month of since (default: now) through
+        months_ahead months after now (PostgreSQL only; no-op on other databases).
+        Run at startup and periodically (see run.py) so rows never land in the
+        default partition; old months can then be dropped with DETACH PARTITION
+        instead of a bulk DELETE. Rows that did land in the default partition for a
+        month are moved into that month's partition when it is created.
+        
+        Returns:
+            list: Names of the partitions created
+        """
+        if connection.dialect.name != 'postgresql':
+            return []
+        table = cls.__tablename__
+        relkind = connection.scalar(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+                                    {'name': table})
+        if relkind != 'p':
+            # A plain table from before partitioning: PARTITION OF would fail
+            logger.warning(f"{table} is not partitioned, skipping partition maintenance "
+                           f"(convert it with core/database/upgrade_sqlite.py)")
+            return []
+        
+        now = now or datetime.utcnow()
+        since = since or now
+        created = []
+        for index in range(since.year * 12 + since.month - 1, now.year * 12 + now.month + months_ahead):
+            (year, month), (next_year, next_month) = divmod(index, 12), divmod(index + 1, 12)
+            name = f"{table}_y{year}m{month + 1:02d}"
+            if connection.scalar(text("SELECT to_regclass(:name)"), {'name': name}) is not None:
+                continue
+            lower, upper = datetime(year, month + 1, 1), datetime(next_year, next_month + 1, 1)
+            bounds = f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+            cls._create_partition(connection, name, bounds, lower, upper)
+            created.append(name)
+        return created
+    
+    @classmethod
+    def _create_partition(cls, connection: Connection, name: str, bounds: str, lower: datetime, upper: datetime):
+        """Create one monthly partition, moving its rows out of the default partition first"""
+        table, default = cls.__tablename__, f"{cls.__tablename__}_default"
+        window = {'lower': lower, 'upper': upper}
+        # Hold off inserts into the default partition until the new month is attached
+        connection.execute(text(f"LOCK TABLE {default} IN SHARE MODE"))
+        stranded = connection.scalar(text(
+            f"SELECT EXISTS (SELECT 1 FROM {default} WHERE timestamp >= :lower AND timestamp < :upper)"
+        ), window)
+        if not stranded:
+            connection.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+            return
+        
+        # PARTITION OF would violate the default partition's constraint, so build the
+        # month as a standalone table and attach it once the rows have moved over
+        connection.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        moved = connection.execute(text(
+            f"WITH moved AS (DELETE FROM {default} WHERE timestamp >= :lower AND timestamp < :upper RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), window).rowcount
+        connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} {bounds}"))
+        logger.info(f"Moved {moved} rows from {default} into new partition {name}")
+    
+    @classmethod
+    def _query_with_related(cls, session: Session):
+        """Query logs with user, card and zone batch-loaded (one IN query each, no N+1)"""
+        return session.query(cls).options(
+            selectinload(cls.user), selectinload(cls.card), selectinload(cls.zone)
+        )
+    
+    @classmethod
+    def _before(cls, before: Optional[datetime], before_id: Optional[uuid.UUID]):
+        """
+        Keyset cursor condition: rows strictly after (timestamp, id) in newest-first
+        order. Without before_id, every row at the `before` timestamp is skipped.
+        """
+        if before_id is None:
+            return cls.timestamp < before
+        return tuple_(cls.timestamp, cls.id) < tuple_(before, before_id)
+    
+    @classmethod
+    def _page(cls, query, since: datetime, before: Optional[datetime], limit: int,
+              before_id: Optional[uuid.UUID] = None):
+        """
+        Newest-first keyset page: rows from since up to the (before, before_id) cursor,
+        at most limit of them. Pass the last row's timestamp and id as `before` and
+        `before_id` to fetch the next page; logs sharing a timestamp are never skipped.
+        """
+        query = query.filter(cls.timestamp >= since)
+        if before is not None:
+            query = query.filter(cls._before(before, before_id))
+        return query.order_by(cls.timestamp.desc(), cls.id.desc()).limit(limit).all()
+    
+    @classmethod
+    def get_failed_attempts(cls, session: Session, hours: int = 24, limit: int = 100,
+                            before: Optional[datetime] = None, before_id: Optional[uuid.UUID] = None):
         """Get recent failed access attempts"""
         since = datetime.utcnow() - timedelta(hours=hours)
-        return session.query(cls).filter(
-            cls.status != AccessStatus.GRANTED,
-            cls.timestamp >= since
-        ).order_by(cls.timestamp.desc()).limit(limit).all()
+        return cls._page(cls._query_with_related(session).filter(
+            cls.status != AccessStatus.GRANTED
+        ), since, before, limit, before_id)
     
     @classmethod
-    def get_suspicious_activity(cls, session: Session, hours: int = 24):
+    def get_suspicious_activity(cls, session: Session, hours: int = 24, limit: int = 500,
+                                before: Optional[datetime] = None, before_id: Optional[uuid.UUID] = None):
         """Get logs marked as suspicious"""
         since = datetime.utcnow() - timedelta(hours=hours)
-        return session.query(cls).filter(
-            cls.is_suspicious == True,
-            cls.timestamp >= since
-        ).order_by(cls.timestamp.desc()).all()
+        return cls._page(cls._query_with_related(session).filter(
+            cls.is_suspicious == True
+        ), since, before, limit, before_id)
     
     @classmethod
-    def get_user_history(cls, session: Session, user_id: int, days: int = 30):
+    def get_user_history(cls, session: Session, user_id: int, days: int = 30, limit: int = 500,
+                         before: Optional[datetime] = None, before_id: Optional[uuid.UUID] = None):
         """Get access history for specific user"""
         since = datetime.utcnow() - timedelta(days=days)
-        return session.query(cls).filter(
-            cls.user_id == user_id,
-            cls.timestamp >= since
-        ).order_by(cls.timestamp.desc()).all()
+        return cls._page(cls._query_with_related(session).filter(
+            cls.user_id == user_id
+        ), since, before, limit, before_id)
     
     @classmethod
-    def get_zone_activity(cls, session: Session, zone_id: int, hours: int = 24):
+    def get_zone_activity(cls, session: Session, zone_id: int, hours: int = 24, limit: int = 500,
+                          before: Optional[datetime] = None, before_id: Optional[uuid.UUID] = None):
         """Get recent activity for specific zone"""
         since = datetime.utcnow() - timedelta(hours=hours)
-        return session.query(cls).filter(
-            cls.zone_id == zone_id,
+        return cls._page(cls._query_with_related(session).filter(
+            cls.zone_id == zone_id
+        ), since, before, limit, before_id)
+    
+    @classmethod
+    def get_recent_rows(cls, session: Session, hours: int = 24, limit: int = 100):
+        """Get recent logs as lightweight rows (no ORM objects) for listings and reports"""
+        since = datetime.utcnow() - timedelta(hours=hours)
+        return session.query(
+            cls.id, cls.timestamp, cls.status, cls.user_id, cls.card_id,
+            cls.zone_id, cls.reason, cls.device_id
+        ).filter(
             cls.timestamp >= since
-        ).order_by(cls.timestamp.desc()).all()
+        ).order_by(cls.timestamp.desc()).limit(limit).all()
     
     @classmethod
     def count_attempts_by_card(cls, session: Session, card_id: int, hours: int = 1):
         """Count access attempts by card in recent hours"""
         since = datetime.utcnow() - timedelta(hours=hours)
-        return session.query(cls).filter(
-            cls.card_id == card_id,
-            cls.timestamp >= since
-        ).count()
+        return session.execute(
+            select(func.count()).select_from(cls).where(
+                cls.card_id == card_id,
+                cls.timestamp >= since
+            )
+        ).scalar()
     
     # Instance Methods
     
@@ -228,31 +458,54 @@ class AccessLog(Base):
     
     def to_dict(self, include_details: bool = False) -> dict:
         """Convert log to dictionary"""
-        data = {
-            'id': self.id,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
-            'status': self.status.value,
-            'user_id': self.user_id,
-            'card_id': self.card_id,
-            'zone_id': self.zone_id,
-            'device_id': self.device_id,
-            'reason': self.reason,
-            'is_entry': self.is_entry,
-            'is_success': self.is_success
-        }
+        return self._serialize(self.__getattribute__, include_details)
+    
+    @classmethod
+    def get_log_dicts(cls, session: Session, limit: int = 100, include_details: bool = False,
+                      before: Optional[datetime] = None, before_id: Optional[uuid.UUID] = None) -> List[dict]:
+        """
+        Recent logs already serialized like to_dict(), read straight from a Core
+        SELECT (no ORM objects) for API pages. Newest first; pass the last row's
+        timestamp and id as `before` and `before_id` for the next page (keyset, see _page).
+        """
+        keys = cls._BASIC_KEYS + cls._DERIVED_KEYS
+        if include_details:
+            keys += cls._DETAIL_KEYS
+        query = select(*(getattr(cls, key) for key in keys))
+        if before is not None:
+            query = query.where(cls._before(before, before_id))
+        rows = session.execute(query.order_by(cls.timestamp.desc(), cls.id.desc()).limit(limit)).mappings()
+        return [cls._serialize(row.__getitem__, include_details) for row in rows]
+    
+    # Columns copied as-is by to_dict; the fields in _DERIVED_KEYS are converted in _serialize
+    _BASIC_KEYS = ('user_id', 'card_id', 'zone_id', 'device_id', 'reason', 'is_entry')
+    _DERIVED_KEYS = ('id', 'timestamp', 'status')
+    _DETAIL_KEYS = ('uid_attempted', 'exit_time', 'duration_seconds', 'is_suspicious', 'alert_triggered',
+                    'decision_time_ms', 'device_location', 'ip_address', 'notes')
+    
+    @classmethod
+    def _serialize(cls, get, include_details: bool) -> dict:
+        """Build the to_dict() payload from an attribute getter (ORM instance or result row)"""
+        data = {key: get(key) for key in cls._BASIC_KEYS}
+        status = get('status')
+        data['id'] = str(get('id'))
+        data['timestamp'] = get('timestamp').isoformat()
+        data['status'] = status.value
+        data['is_success'] = status is AccessStatus.GRANTED
         
         if include_details:
-            data.update({
-                'uid_attempted': self.uid_attempted,
-                'exit_time': self.exit_time.isoformat() if self.exit_time else None,
-                'time_in_zone': self.time_in_zone,
-                'duration_seconds': self.duration_seconds,
-                'is_suspicious': self.is_suspicious,
-                'alert_triggered': self.alert_triggered,
-                'decision_time_ms': self.decision_time_ms,
-                'device_location': self.device_location,
-                'ip_address': self.ip_address,
-                'notes': self.notes
-            })
+            for key in cls._DETAIL_KEYS:
+                data[key] = get(key)
+            exit_time = data['exit_time']
+            if exit_time is not None:
+                data['exit_time'] = exit_time.isoformat()
+            data['time_in_zone'] = cls._format_time_in_zone(exit_time, data['duration_seconds'], data['is_entry'])
         
         return data
+
+# Catch-all partition so inserts never fail when a month has not been created yet
+event.listen(
+    AccessLog.__table__, 'after_create',
+    DDL("CREATE TABLE IF NOT EXISTS access_logs_default PARTITION OF access_logs DEFAULT")
+    .execute_if(dialect='postgresql'),
+)
@@ -3,14 +3,33 @@ AccessPolicy Model
 ==================
 Defines access control policies and rules
 """
-from datetime import datetime, timedelta
-from typing import List
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean
-from sqlalchemy import Enum as SQLEnum
-from sqlalchemy.orm import relationship
+import os
+from datetime import datetime, timedelta, timezone
+from typing import FrozenSet, List, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Table, select, insert, delete, event
+from sqlalchemy.orm import relationship, object_session, Session
 
 from core.database.corefiles.base import Base
+from core.database.corefiles.clock import utcnow, parse_minutes, format_minutes, in_minute_window
 from core.database.corefiles.enums import PolicyType, UserRole, DayOfWeek
+from core.database.corefiles.types import EnumCode
+from core.database.corefiles.associations import (
+    policy_whitelist_association,
+    policy_blacklist_association,
+    policy_role_association,
+)
+
+# Time zone the policy time windows are written in (POLICY_TIMEZONE), resolved once
+_LOCAL_TZ_NAME = os.getenv("POLICY_TIMEZONE", "Asia/Tehran")
+try:
+    _LOCAL_TZ = ZoneInfo(_LOCAL_TZ_NAME)
+except ZoneInfoNotFoundError:
+    if _LOCAL_TZ_NAME != "Asia/Tehran":
+        raise
+    # No tz database (e.g. Windows without the tzdata package): fixed offset of the default zone
+    _LOCAL_TZ = timezone(timedelta(hours=3, minutes=30))
 
 
 class AccessPolicy(Base):
@@ -27,27 +46,22 @@ class AccessPolicy(Base):
     zone_id = Column(Integer, ForeignKey('zones.id', ondelete='CASCADE'), nullable=False, index=True)
     
     # Policy Identification
-    policy_type = Column(SQLEnum(PolicyType), nullable=False, index=True)
+    policy_type = Column(EnumCode(PolicyType), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     code = Column(String(50), unique=True, nullable=True)
     description = Column(Text, nullable=True)
     
     # Time-Based Rules
-    time_start = Column(String(5), nullable=True)
-    time_end = Column(String(5), nullable=True)
-    days_of_week = Column(String(50), nullable=True)
+    time_start_min = Column(SmallInteger, nullable=True)  # minutes since midnight (local time)
+    time_end_min = Column(SmallInteger, nullable=True)
+    days_mask = Column(SmallInteger, nullable=True)  # bit n set = ISO weekday n allowed (1=Monday)
     
     # Date-Based Rules
     valid_from = Column(DateTime, nullable=True)
     valid_until = Column(DateTime, nullable=True)
     
-    # Role-Based Rules
-    allowed_roles = Column(String(255), nullable=True)
-    denied_roles = Column(String(255), nullable=True)
-    
-    # Whitelist/Blacklist
-    whitelist_users = Column(Text, nullable=True)
-    blacklist_users = Column(Text, nullable=True)
+    # Role-Based Rules, Whitelist/Blacklist: see policy_role_association,
+    # policy_whitelist_association and policy_blacklist_association
     
     # Capacity Limits
     max_concurrent_users = Column(Integer, nullable=True)
@@ -97,8 +111,10 @@ class AccessPolicy(Base):
     @property
     def is_valid(self) -> bool:
         """Check if policy is currently valid"""
-        now = datetime.utcnow()
-        
+        return self.is_valid_at(utcnow())
+    
+    def is_valid_at(self, now: datetime) -> bool:
+        """Check if policy is valid at the given time"""
         if self.valid_from and now < self.valid_from:
             return False
         
@@ -110,12 +126,30 @@ class AccessPolicy(Base):
     @property
     def is_time_restricted(self) -> bool:
         """Check if policy has time restrictions"""
-        return bool(self.time_start and self.time_end)
+        return self.time_start_min is not None and self.time_end_min is not None
+    
+    @property
+    def time_start(self) -> str:
+        """Window start as HH:MM"""
+        return format_minutes(self.time_start_min)
+    
+    @property
+    def time_end(self) -> str:
+        """Window end as HH:MM"""
+        return format_minutes(self.time_end_min)
     
     @property
     def is_role_restricted(self) -> bool:
         """Check if policy has role restrictions"""
-        return bool(self.allowed_roles or self.denied_roles)
+        allowed, denied = self.get_role_restrictions()
+        return bool(allowed or denied)
+    
+    @property
+    def allowed_days(self) -> List[int]:
+        """Allowed ISO weekdays (1=Monday, 7=Sunday); empty means every day"""
+        if not self.days_mask:
+            return []
+        return [day for day in range(1, 8) if self.days_mask >> day & 1]
     
     # Validation Methods
     
@@ -129,23 +163,16 @@ class AccessPolicy(Base):
         Returns:
             bool: True if time is allowed
         """
-        if not check_time:
-            check_time = datetime.utcnow()
-        
-        # Convert to local time (adjust offset as needed)
-        local_time = check_time + timedelta(hours=3, minutes=30)
+        local_time = self.local_time(check_time or utcnow())
         
         # Check day of week
-        if self.days_of_week:
-            allowed_days = [int(d) for d in self.days_of_week.split(',')]
-            if local_time.isoweekday() not in allowed_days:
-                return False
+        if self.days_mask and not self.days_mask >> local_time.isoweekday() & 1:
+            return False
         
-        # Check time range
-        if self.time_start and self.time_end:
-            current_str = local_time.strftime("%H:%M")
-            if not (self.time_start <= current_str <= self.time_end):
-                return False
+        # Check time range (overnight windows such as 22:00-06:00 included)
+        if self.is_time_restricted:
+            current = local_time.hour * 60 + local_time.minute
+            return in_minute_window(current, self.time_start_min, self.time_end_min)
         
         return True
     
@@ -159,33 +186,43 @@ class AccessPolicy(Base):
         Returns:
             bool: True if role is allowed
         """
-        # Check denied roles first
-        if self.denied_roles:
-            denied = self.denied_roles.split(',')
-            if user_role.value in denied:
-                return False
-        
-        # Check allowed roles
-        if self.allowed_roles:
-            allowed = self.allowed_roles.split(',')
-            return user_role.value in allowed
+        allowed, denied = self.get_role_restrictions()  # memoized frozensets
+        role = user_role.value
         
-        # If no role restrictions, allow all
-        return True
+        # Denied roles win; an empty allow-list allows every other role
+        if role in denied:
+            return False
+        return not allowed or role in allowed
     
     def is_user_whitelisted(self, user_id: int) -> bool:
         """Check if user is in whitelist"""
-        if not self.whitelist_users:
-            return False
-        user_ids = [int(uid) for uid in self.whitelist_users.split(',')]
-        return user_id in user_ids
+        return user_id in self._cached('whitelist', lambda: frozenset(self.get_whitelist()))
     
     def is_user_blacklisted(self, user_id: int) -> bool:
         """Check if user is in blacklist"""
-        if not self.blacklist_users:
-            return False
-        user_ids = [int(uid) for uid in self.blacklist_users.split(',')]
-        return user_id in user_ids
+        return user_id in self._cached('blacklist', lambda: frozenset(self.get_blacklist()))
+    
+    def get_role_restrictions(self) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """Get (allowed, denied) role values"""
+        return self._cached('roles', self._load_role_restrictions)
+    
+    def _load_role_restrictions(self) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        rows = self._session().execute(
+            select(policy_role_association.c.role, policy_role_association.c.is_allowed)
+            .where(policy_role_association.c.policy_id == self.id)
+        )
+        allowed, denied = set(), set()
+        for role, is_allowed in rows:
+            (allowed if is_allowed else denied).add(role)
+        return frozenset(allowed), frozenset(denied)
+    
+    def get_whitelist(self) -> List[int]:
+        """Get whitelisted user IDs"""
+        return self._get_users(policy_whitelist_association)
+    
+    def get_blacklist(self) -> List[int]:
+        """Get blacklisted user IDs"""
+        return self._get_users(policy_blacklist_association)
     
     def check_access(self, user=None, check_time: datetime = None) -> tuple[bool, str]:
         """
@@ -193,17 +230,20 @@ class AccessPolicy(Base):
         
         Args:
             user: User object
-            check_time: Time to check
+            check_time: Time to check (default: now, resolved once for all sub-checks)
             
         Returns:
             tuple: (access_allowed, reason)
         """
+        if not check_time:
+            check_time = utcnow()
+        
         # Check if policy is active
         if not self.is_active:
             return True, "Policy inactive"  # Inactive policies allow access
         
         # Check validity period
-        if not self.is_valid:
+        if not self.is_valid_at(check_time):
             return True, "Policy not valid yet"
         
         # Check time restrictions
@@ -234,44 +274,26 @@ class AccessPolicy(Base):
     def activate(self):
         """Activate the policy"""
         self.is_active = True
-        self.updated_at = datetime.utcnow()
     
     def deactivate(self):
         """Deactivate the policy"""
         self.is_active = False
-        self.updated_at = datetime.utcnow()
     
     def add_to_whitelist(self, user_ids: List[int]):
         """Add users to whitelist"""
-        existing = set(self.whitelist_users.split(',')) if self.whitelist_users else set()
-        existing.update([str(uid) for uid in user_ids])
-        self.whitelist_users = ','.join(sorted(existing))
-        self.updated_at = datetime.utcnow()
+        self._add_users(policy_whitelist_association, user_ids)
     
     def remove_from_whitelist(self, user_ids: List[int]):
         """Remove users from whitelist"""
-        if not self.whitelist_users:
-            return
-        existing = set(self.whitelist_users.split(','))
-        existing.difference_update([str(uid) for uid in user_ids])
-        self.whitelist_users = ','.join(sorted(existing)) if existing else None
-        self.updated_at = datetime.utcnow()
+        self._remove_users(policy_whitelist_association, user_ids)
     
     def add_to_blacklist(self, user_ids: List[int]):
         """Add users to blacklist"""
-        existing = set(self.blacklist_users.split(',')) if self.blacklist_users else set()
-        existing.update([str(uid) for uid in user_ids])
-        self.blacklist_users = ','.join(sorted(existing))
-        self.updated_at = datetime.utcnow()
+        self._add_users(policy_blacklist_association, user_ids)
     
     def remove_from_blacklist(self, user_ids: List[int]):
         """Remove users from blacklist"""
-        if not self.blacklist_users:
-            return
-        existing = set(self.blacklist_users.split(','))
-        existing.difference_update([str(uid) for uid in user_ids])
-        self.blacklist_users = ','.join(sorted(existing)) if existing else None
-        self.updated_at = datetime.utcnow()
+        self._remove_users(policy_blacklist_association, user_ids)
     
     def set_time_restriction(self, start: str, end: str, days: List[int] = None):
         """
@@ -282,11 +304,13 @@ class AccessPolicy(Base):
             end: End time in HH:MM format
             days: List of day numbers (1=Monday, 7=Sunday)
         """
-        self.time_start = start
-        self.time_end = end
+        self.time_start_min = parse_minutes(start)
+        self.time_end_min = parse_minutes(end)
         if days:
-            self.days_of_week = ','.join([str(d) for d in days])
-        self.updated_at = datetime.utcnow()
+            mask = 0
+            for day in days:
+                mask |= 1 << int(day)
+            self.days_mask = mask
     
     def set_role_restriction(self, allowed: List[str] = None, denied: List[str] = None):
         """
@@ -297,41 +321,115 @@ class AccessPolicy(Base):
             denied: List of denied role values
         """
         if allowed:
-            self.allowed_roles = ','.join(allowed)
+            self._set_roles(allowed, is_allowed=True)
         if denied:
-            self.denied_roles = ','.join(denied)
-        self.updated_at = datetime.utcnow()
+            self._set_roles(denied, is_allowed=False)
     
     def record_application(self):
         """Record that this policy was applied"""
         self.last_applied = datetime.utcnow()
     
+    # Columns copied as-is by to_dict
+    _BASIC_KEYS = ('id', 'name', 'code', 'zone_id', 'is_active', 'priority')
+    _DETAIL_KEYS = ('description', 'time_start', 'time_end', 'require_escort', 'require_approval', 'require_two_factor')
+    
     def to_dict(self, include_details: bool = False) -> dict:
         """Convert policy to dictionary"""
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'code': self.code,
-            'policy_type': self.policy_type.value,
-            'zone_id': self.zone_id,
-            'is_active': self.is_active,
-            'priority': self.priority,
-            'is_valid': self.is_valid
-        }
+        data = {key: getattr(self, key) for key in self._BASIC_KEYS}
+        data['policy_type'] = self.policy_type.value
+        data['is_valid'] = self.is_valid
         
         if include_details:
-            data.update({
-                'description': self.description,
-                'time_start': self.time_start,
-                'time_end': self.time_end,
-                'days_of_week': self.days_of_week,
-                'allowed_roles': self.allowed_roles,
-                'denied_roles': self.denied_roles,
-                'require_escort': self.require_escort,
-                'require_approval': self.require_approval,
-                'require_two_factor': self.require_two_factor,
-                'created_at': self.created_at.isoformat() if self.created_at else None,
-                'last_applied': self.last_applied.isoformat() if self.last_applied else None
-            })
+            allowed_roles, denied_roles = self.get_role_restrictions()
+            for key in self._DETAIL_KEYS:
+                data[key] = getattr(self, key)
+            data['days_of_week'] = self.allowed_days
+            data['allowed_roles'] = sorted(allowed_roles)
+            data['denied_roles'] = sorted(denied_roles)
+            data['created_at'] = self.created_at.isoformat() if self.created_at else None
+            data['last_applied'] = self.last_applied.isoformat() if self.last_applied else None
         
         return data
+    
+    # Time Helpers
+    
+    @staticmethod
+    def local_time(check_time: datetime) -> datetime:
+        """UTC time (naive values are taken as UTC) -> local time of the time windows"""
+        if check_time.tzinfo is None:
+            check_time = check_time.replace(tzinfo=timezone.utc)
+        return check_time.astimezone(_LOCAL_TZ)
+    
+    # Association Table Helpers
+    
+    def _session(self) -> Session:
+        """Owning session; flushes first so the policy has an id to key rows on"""
+        session = object_session(self)
+        if session is None:
+            raise ValueError("AccessPolicy must be added to a session first")
+        if self.id is None:
+            session.flush()
+        return session
+    
+    def _get_users(self, table: Table) -> List[int]:
+        return sorted(self._session().scalars(
+            select(table.c.user_id).where(table.c.policy_id == self.id)
+        ))
+    
+    def _cached(self, key: str, loader):
+        """Per-instance memo of association lookups, dropped on any write/expire/refresh"""
+        cache = self.__dict__.get('_lookup_cache')
+        if cache is None:
+            cache = self.__dict__['_lookup_cache'] = {}
+        if key not in cache:
+            cache[key] = loader()
+        return cache[key]
+    
+    def _invalidate_cache(self):
+        self.__dict__.pop('_lookup_cache', None)
+    
+    def _associations_changed(self):
+        """
+        Association rows are written with Core, which the unit of work does not see,
+        so stamp updated_at here; column changes get it from the column's onupdate
+        """
+        self._invalidate_cache()
+        self.updated_at = datetime.utcnow()
+    
+    def _add_users(self, table: Table, user_ids: List[int]):
+        self._associations_changed()
+        session = self._session()
+        existing = set(self._get_users(table))
+        rows = [{'policy_id': self.id, 'user_id': uid} for uid in set(map(int, user_ids)) - existing]
+        if rows:
+            session.execute(insert(table), rows)
+    
+    def _remove_users(self, table: Table, user_ids: List[int]):
+        self._associations_changed()
+        self._session().execute(
+            delete(table).where(table.c.policy_id == self.id, table.c.user_id.in_(user_ids))
+        )
+    
+    def _set_roles(self, roles: List[str], is_allowed: bool):
+        """Replace the allowed (or denied) role list"""
+        self._associations_changed()
+        table = policy_role_association
+        session = self._session()
+        session.execute(
+            delete(table).where(table.c.policy_id == self.id, table.c.is_allowed == is_allowed)
+        )
+        session.execute(insert(table), [
+            {'policy_id': self.id, 'role': role, 'is_allowed': is_allowed} for role in set(roles)
+        ])
+
+
+# Drop memoized lookups whenever the session expires or reloads the policy
+# (raw: the instance may already be garbage-collected when its state is expired)
+@event.listens_for(AccessPolicy, 'expire', raw=True)
+def _on_policy_expire(state, attrs):
+    state.dict.pop('_lookup_cache', None)
+
+
+@event.listens_for(AccessPolicy, 'refresh', raw=True)
+def _on_policy_refresh(state, context, attrs):
+    state.dict.pop('_lookup_cache', None)
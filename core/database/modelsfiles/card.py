@@ -4,14 +4,63 @@ Card Model
 Manages NFC cards, security, and validation
 """
 from datetime import datetime
+import functools
 import hashlib
+import os
 import secrets
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean
-from sqlalchemy import Enum as SQLEnum
-from sqlalchemy.orm import relationship
+import threading
+from typing import Iterable, List
+from sqlalchemy import Sequence, Column, Integer, SmallInteger, BigInteger, String, DateTime, ForeignKey, Text, Boolean, LargeBinary, Index
+from sqlalchemy.orm import relationship, validates, Session
 
 from core.database.corefiles.base import Base
+from core.database.corefiles.clock import utcnow, utcnow_ns, to_epoch_ns
 from core.database.corefiles.enums import CardStatus
+from core.database.corefiles.types import EnumCode
+
+# Keyed hashing: the key acts as a per-deployment salt for stored UID hashes.
+_UID_HASH_KEY = hashlib.sha256(os.getenv("UID_HASH_KEY", "nfc-access-control").encode()).digest()
+_UID_HASH_SIZE = 16
+_NS_PER_DAY = 86_400 * 10**9
+
+# UID_HASH_BACKEND: "blake2s" (default, standard library) or "blake3" (needs the blake3
+# package). The digests differ, so the backend is an explicit setting and never depends
+# on which packages happen to be installed. Changing it, or UID_HASH_KEY, invalidates
+# every stored uid_hash and uid_fp: recompute both for all cards from Card.uid
+# (hash_uids_bulk, uid_fingerprint) before serving taps, or no card will match.
+UID_HASH_BACKEND = (os.getenv("UID_HASH_BACKEND") or "blake2s").lower()
+
+# Hasher with the key already absorbed; copying it skips the per-UID key setup
+# (for BLAKE2s that is a whole compression of the key block)
+if UID_HASH_BACKEND == "blake2s":
+    _UID_HASHER = hashlib.blake2s(key=_UID_HASH_KEY, digest_size=_UID_HASH_SIZE)
+elif UID_HASH_BACKEND == "blake3":
+    try:
+        from blake3 import blake3
+    except ImportError as e:
+        raise ImportError("UID_HASH_BACKEND=blake3 requires the blake3 package") from e
+    _UID_HASHER = blake3(key=_UID_HASH_KEY)
+else:
+    raise ValueError(f"Unknown UID_HASH_BACKEND {UID_HASH_BACKEND!r} (expected 'blake2s' or 'blake3')")
+
+_CARD_STATUS_TYPE = EnumCode(CardStatus)
+
+# Card numbers (PostgreSQL): each nextval reserves a block of _CARD_NUMBER_BLOCK
+# numbers that this process hands out locally, so most issuances skip the round-trip
+_CARD_NUMBER_BLOCK = 1000
+_card_number_seq = Sequence('card_number_seq', increment=_CARD_NUMBER_BLOCK, metadata=Base.metadata)
+_card_number_lock = threading.Lock()
+_card_number_range = [0, 0]  # [next, end)
+
+# check_access denial reason per non-active status
+_STATUS_DENY_REASONS = {
+    CardStatus.EXPIRED: "Card has expired",
+    CardStatus.LOST: "Card reported as lost",
+    CardStatus.STOLEN: "Card reported as stolen",
+    CardStatus.SUSPENDED: "Card is suspended",
+    CardStatus.DAMAGED: "Card is damaged",
+}
+_BLOCKED_STATUSES = CardStatus.blocked_statuses()
 
 
 class Card(Base):
@@ -20,13 +69,23 @@ class Card(Base):
     Handles card information, encryption, and access validation
     """
     __tablename__ = 'cards'
+    __table_args__ = (
+        # uid_hash is only ever probed by equality, so PostgreSQL gets a hash index
+        Index('ix_cards_uid_hash', 'uid_hash', postgresql_using='hash').ddl_if(dialect='postgresql'),
+        # "Does this user hold an active card" is a single index seek; also serves
+        # plain user_id lookups, so user_id has no index of its own
+        Index('ix_cards_user_status', 'user_id', 'status'),
+        # Status filters and "status + expiry" sweeps; replaces a status-only index
+        Index('ix_cards_status_expires', 'status', 'expires_at'),
+    )
 
     # Primary Key
     id = Column(Integer, primary_key=True, autoincrement=True)
     
     # Card Identifiers (encrypted)
     uid = Column(String(255), unique=True, nullable=False, index=True)
-    uid_hash = Column(String(64), unique=True, nullable=False, index=True)
+    uid_hash = Column(LargeBinary(16), unique=True, nullable=False)
+    uid_fp = Column(SmallInteger, nullable=True, index=True)  # first 16 bits of uid_hash
     
     # Card Information
     card_number = Column(String(50), unique=True, nullable=True, index=True)
@@ -35,13 +94,14 @@ class Card(Base):
     serial_number = Column(String(100), nullable=True)
     
     # User Association
-    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     
     # Status and Validity
-    status = Column(SQLEnum(CardStatus), default=CardStatus.ACTIVE, nullable=False, index=True)
+    status = Column(_CARD_STATUS_TYPE, default=CardStatus.ACTIVE, nullable=False)
     issued_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     activated_at = Column(DateTime, nullable=True)
     expires_at = Column(DateTime, nullable=True, index=True)
+    expires_at_ns = Column(BigInteger, nullable=True)  # expires_at as epoch nanoseconds, for integer compares
     
     # Security
     is_encrypted = Column(Boolean, default=True, nullable=False)
@@ -68,7 +128,8 @@ class Card(Base):
     revocation_reason = Column(Text, nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="cards", foreign_keys=[user_id])
+    # Every validity/access check reads the owner, so load it in the same SELECT
+    user = relationship("User", back_populates="cards", foreign_keys=[user_id], lazy='joined')
     access_logs = relationship("AccessLog", back_populates="card", cascade="all, delete-orphan", lazy='dynamic')
     replacement = relationship("Card", remote_side=[id], uselist=False)
 
@@ -76,58 +137,119 @@ class Card(Base):
         return f"<Card(id={self.id}, number='{self.card_number}', status={self.status.value})>"
 
     def __str__(self):
-        return f"Card {self.card_number or self.uid_hash[:8]}"
+        return f"Card {self.card_number or self.uid_hash[:4].hex()}"
 
     # Static Methods
     
     @staticmethod
-    def hash_uid(uid: str) -> str:
-        """Hash UID using SHA-256"""
-        return hashlib.sha256(uid.encode()).hexdigest()
+    @functools.lru_cache(maxsize=4096)
+    def hash_uid(uid: str) -> bytes:
+        """Hash UID using keyed BLAKE2s or BLAKE3 (UID_HASH_BACKEND), truncated to 128 bits (memoized; the key is fixed per process)"""
+        hasher = _UID_HASHER.copy()
+        hasher.update(uid.encode())
+        return hasher.digest()[:_UID_HASH_SIZE]
+    
+    @staticmethod
+    def hash_uids_bulk(uids: Iterable[str]) -> List[bytes]:
+        """Hash many UIDs (bulk imports); same digests as hash_uid, without filling its memo"""
+        copy, size = _UID_HASHER.copy, _UID_HASH_SIZE
+        hashes = []
+        for uid in uids:
+            hasher = copy()
+            hasher.update(uid.encode())
+            hashes.append(hasher.digest()[:size])
+        return hashes
     
     @staticmethod
-    def generate_card_number(prefix: str = "NFC") -> str:
-        """Generate unique card number"""
-        random_part = secrets.token_hex(6).upper()
-        timestamp = datetime.utcnow().strftime("%y%m")
-        return f"{prefix}-{timestamp}-{random_part}"
+    def uid_fingerprint(uid_hash: bytes) -> int:
+        """Get the 16-bit fingerprint (signed, to fit SMALLINT) of a UID hash"""
+        return int.from_bytes(uid_hash[:2], 'big', signed=True)
+    
+    @staticmethod
+    def generate_card_number(prefix: str = "NFC", session: Session = None) -> str:
+        """
+        Generate unique card number
+        
+        With a PostgreSQL session the number comes from card_number_seq (plus a short
+        random suffix); otherwise uniqueness rests on a 48-bit random part.
+        """
+        if session is not None and session.get_bind().dialect.name == 'postgresql':
+            with _card_number_lock:
+                if _card_number_range[0] >= _card_number_range[1]:
+                    start = session.scalar(_card_number_seq.next_value())
+                    _card_number_range[:] = [start, start + _CARD_NUMBER_BLOCK]
+                number = _card_number_range[0]
+                _card_number_range[0] += 1
+            return f"{prefix}-{number:010d}-{os.urandom(2).hex().upper()}"
+        
+        return f"{prefix}-{utcnow():%y%m}-{secrets.token_hex(6).upper()}"
     
     @staticmethod
     def generate_security_code() -> str:
         """Generate 6-digit security code"""
-        return ''.join([str(secrets.randbelow(10)) for _ in range(6)])
+        # One urandom draw per 8 bytes; bytes >= 250 are rejected so x % 10 stays uniform
+        digits = []
+        while len(digits) < 6:
+            digits.extend(str(x % 10) for x in secrets.token_bytes(8) if x < 250)
+        return ''.join(digits[:6])
+    
+    @staticmethod
+    def status_deny_reason(status: CardStatus, expired: bool) -> str:
+        """check_access reason for a non-active card (a passed expiry date wins)"""
+        if expired:
+            return _STATUS_DENY_REASONS[CardStatus.EXPIRED]
+        return _STATUS_DENY_REASONS.get(status) or f"Card is {status.value}"
+    
+    @validates('uid_hash')
+    def _sync_uid_fp(self, key, uid_hash):
+        """Keep the fingerprint column in step with uid_hash"""
+        self.uid_fp = self.uid_fingerprint(uid_hash) if uid_hash else None
+        return uid_hash
+    
+    @validates('expires_at')
+    def _sync_expires_at_ns(self, key, expires_at):
+        """Keep the nanosecond copy in step with expires_at"""
+        self.expires_at_ns = to_epoch_ns(expires_at) if expires_at else None
+        return expires_at
     
     # Properties
     
     @property
     def is_expired(self) -> bool:
-        """Check if card has expired"""
+        """Check if card has expired (integer compare on expires_at_ns)"""
+        if self.expires_at_ns is None:
+            # Also covers rows written before expires_at_ns existed
+            return self.is_expired_at(utcnow())
+        return self.expires_at_ns < utcnow_ns()
+    
+    def is_expired_at(self, now: datetime) -> bool:
+        """Check if card has expired at the given time"""
         if not self.expires_at:
             return False
-        return self.expires_at < datetime.utcnow()
+        return self.expires_at < now
     
     @property
     def days_until_expiry(self) -> int:
         """Get days until card expires"""
         if not self.expires_at:
             return 999999
-        delta = self.expires_at - datetime.utcnow()
-        return max(0, delta.days)
+        if self.expires_at_ns is None:
+            return max(0, (self.expires_at - utcnow()).days)
+        return max(0, (self.expires_at_ns - utcnow_ns()) // _NS_PER_DAY)
     
     @property
     def is_blocked(self) -> bool:
         """Check if card is in blocked status"""
-        blocked_statuses = [CardStatus.LOST, CardStatus.STOLEN, CardStatus.SUSPENDED]
-        return self.status in blocked_statuses
+        return self.status in _BLOCKED_STATUSES
     
     # Validation Methods
     
-    def is_valid(self) -> bool:
-        """Check if card is valid for use"""
+    def is_valid(self, now: datetime = None) -> bool:
+        """Check if card is valid for use (at `now` if given)"""
         if self.status != CardStatus.ACTIVE:
             return False
         
-        if self.is_expired:
+        if self.is_expired if now is None else self.is_expired_at(now):
             return False
         
         if not self.user.is_active:
@@ -135,36 +257,30 @@ class Card(Base):
         
         return True
     
-    def check_access(self, zone=None) -> tuple[bool, str]:
+    def check_access(self, zone=None, now: datetime = None) -> tuple[bool, str]:
         """
         Validate card access
         
         Args:
             zone: Zone object to check access for
+            now: Time to check at (default: current time)
             
         Returns:
             tuple: (access_granted, reason)
         """
-        # Check card status
-        if self.status != CardStatus.ACTIVE:
-            if self.status == CardStatus.EXPIRED or self.is_expired:
-                return False, "Card has expired"
-            elif self.status == CardStatus.LOST:
-                return False, "Card reported as lost"
-            elif self.status == CardStatus.STOLEN:
-                return False, "Card reported as stolen"
-            elif self.status == CardStatus.SUSPENDED:
-                return False, "Card is suspended"
-            elif self.status == CardStatus.DAMAGED:
-                return False, "Card is damaged"
-            else:
-                return False, f"Card is {self.status.value}"
+        if not now:
+            now = utcnow()
+        
+        # Check card status (a passed expiry date wins over the stored status)
+        status = self.status
+        if status is not CardStatus.ACTIVE:
+            return False, self.status_deny_reason(status, self.is_expired_at(now))
         
         # Check user status
         if not self.user.is_active:
             return False, "User account is inactive"
         
-        if not self.user.is_employed:
+        if not self.user.is_employed_at(now):
             return False, "User employment terminated"
         
         # Check zone access if provided
@@ -221,10 +337,10 @@ class Card(Base):
         self.last_used = datetime.utcnow()
         self.updated_at = datetime.utcnow()
     
-    def record_failed_attempt(self):
+    def record_failed_attempt(self, now: datetime = None):
         """Record a failed access attempt"""
         self.failed_attempts += 1
-        self.last_failed_attempt = datetime.utcnow()
+        self.last_failed_attempt = now or datetime.utcnow()
         
         # Auto-suspend after too many failed attempts
         if self.failed_attempts >= 5:
@@ -242,29 +358,24 @@ class Card(Base):
         self.revocation_reason = f"Replaced with card #{new_card_id}"
         self.updated_at = datetime.utcnow()
     
+    # Columns copied as-is by to_dict
+    _BASIC_KEYS = ('id', 'card_number', 'card_type', 'user_id', 'total_uses')
+    _TIME_KEYS = ('issued_at', 'expires_at', 'last_used')
+    _SENSITIVE_KEYS = ('uid', 'security_code', 'failed_attempts', 'notes')
+    
     def to_dict(self, include_sensitive: bool = False) -> dict:
         """Convert card to dictionary"""
-        data = {
-            'id': self.id,
-            'card_number': self.card_number,
-            'card_type': self.card_type,
-            'status': self.status.value,
-            'user_id': self.user_id,
-            'issued_at': self.issued_at.isoformat() if self.issued_at else None,
-            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
-            'last_used': self.last_used.isoformat() if self.last_used else None,
-            'total_uses': self.total_uses,
-            'is_valid': self.is_valid(),
-            'days_until_expiry': self.days_until_expiry
-        }
+        data = {key: getattr(self, key) for key in self._BASIC_KEYS}
+        data['status'] = self.status.value
+        for key in self._TIME_KEYS:
+            value = getattr(self, key)
+            data[key] = value.isoformat() if value else None
+        data['is_valid'] = self.is_valid()
+        data['days_until_expiry'] = self.days_until_expiry
         
         if include_sensitive:
-            data.update({
-                'uid': self.uid,
-                'uid_hash': self.uid_hash,
-                'security_code': self.security_code,
-                'failed_attempts': self.failed_attempts,
-                'notes': self.notes
-            })
+            for key in self._SENSITIVE_KEYS:
+                data[key] = getattr(self, key)
+            data['uid_hash'] = self.uid_hash.hex() if self.uid_hash else None
         
         return data
@@ -4,13 +4,18 @@ User Model
 Manages user accounts, roles, and personal information
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
-from sqlalchemy import Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from typing import List, Optional
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index, event, select, exists, func
+from sqlalchemy.orm import relationship, object_session, Session
 
 from core.database.corefiles.base import Base
+from core.database.corefiles.clock import utcnow
 from core.database.corefiles.enums import UserRole, CardStatus
 from core.database.corefiles.associations import user_zone_association
+from core.database.corefiles.types import EnumCode
+from core.database.modelsfiles.card import Card
+
+_ADMIN_ROLES = UserRole.admin_roles()
 
 
 class User(Base):
@@ -34,7 +39,7 @@ class User(Base):
     employee_id = Column(String(50), unique=True, nullable=True, index=True)
     department = Column(String(100), nullable=True)
     position = Column(String(100), nullable=True)
-    role = Column(SQLEnum(UserRole), default=UserRole.EMPLOYEE, nullable=False, index=True)
+    role = Column(EnumCode(UserRole), default=UserRole.EMPLOYEE, nullable=False, index=True)
     manager_id = Column(Integer, nullable=True)
     
     # Authentication (for future web interface)
@@ -61,8 +66,9 @@ class User(Base):
     bio = Column(Text, nullable=True)
     notes = Column(Text, nullable=True)
     
-    # Relationships
-    cards = relationship("Card", back_populates="user", cascade="all, delete-orphan", lazy='dynamic')
+    # Relationships (small collections load as plain lists on first access; access_logs
+    # stays dynamic because it is unbounded and only read paginated)
+    cards = relationship("Card", back_populates="user", cascade="all, delete-orphan")
     access_logs = relationship("AccessLog", back_populates="user", cascade="all, delete-orphan", lazy='dynamic')
     zones = relationship(
         "Zone",
@@ -71,7 +77,6 @@ class User(Base):
         secondaryjoin="Zone.id==user_zone_association.c.zone_id",
         foreign_keys="[user_zone_association.c.user_id, user_zone_association.c.zone_id]",
         back_populates="users",
-        lazy='dynamic',
     )
 
     def __repr__(self):
@@ -97,12 +102,16 @@ class User(Base):
     @property
     def is_admin(self) -> bool:
         """Check if user has admin privileges"""
-        return self.role in [UserRole.SUPER_ADMIN, UserRole.ADMIN]
+        return self.role in _ADMIN_ROLES
     
     @property
     def is_employed(self) -> bool:
         """Check if user is currently employed"""
-        if self.termination_date and self.termination_date < datetime.utcnow():
+        return self.is_employed_at(utcnow())
+    
+    def is_employed_at(self, now: datetime) -> bool:
+        """Check if user is employed at the given time"""
+        if self.termination_date and self.termination_date < now:
             return False
         return True
     
@@ -110,19 +119,51 @@ class User(Base):
     
     def has_active_card(self) -> bool:
         """Check if user has at least one active card"""
-        return self.cards.filter_by(status=CardStatus.ACTIVE).count() > 0
+        if 'cards' in self.__dict__:  # already loaded, no query needed
+            return any(card.status == CardStatus.ACTIVE for card in self.cards)
+        return object_session(self).scalar(select(exists().where(
+            Card.user_id == self.id, Card.status == CardStatus.ACTIVE
+        )))
     
     def get_active_cards(self):
         """Get all active cards for this user"""
-        return self.cards.filter_by(status=CardStatus.ACTIVE).all()
+        return [card for card in self.cards if card.status == CardStatus.ACTIVE]
     
     def has_zone_access(self, zone_id: int) -> bool:
-        """Check if user has access to specific zone"""
-        return self.zones.filter_by(id=zone_id).count() > 0
+        """
+        Check if user has access to specific zone
+
+        Answered from zone_id_set once something has loaded it (callers checking many
+        zones for one user read user.zone_id_set first). Otherwise runs an EXISTS on
+        user_zone_association, which stops at the first match and sees grants revoked
+        by Core deletes or ON DELETE CASCADE immediately.
+        """
+        zone_ids = self.__dict__.get('_zone_id_set')
+        if zone_ids is not None:
+            return zone_id in zone_ids
+        return object_session(self).scalar(select(exists().where(
+            user_zone_association.c.user_id == self.id,
+            user_zone_association.c.zone_id == zone_id,
+        )))
+    
+    @property
+    def zone_id_set(self) -> frozenset:
+        """
+        Ids of the zones this user may enter, built from the zones collection (one
+        SELECT if it is not loaded yet, pending grants included) and kept until
+        User.zones / Zone.users change or the session expires or refreshes the user
+        """
+        zone_ids = self.__dict__.get('_zone_id_set')
+        if zone_ids is None:
+            zone_ids = self.__dict__['_zone_id_set'] = frozenset(zone.id for zone in self.zones)
+        return zone_ids
+    
+    def _invalidate_zone_ids(self):
+        self.__dict__.pop('_zone_id_set', None)
     
     def get_zones_list(self) -> list:
         """Get list of all accessible zones"""
-        return self.zones.all()
+        return list(self.zones)
     
     def update_last_access(self):
         """Update last access timestamp"""
@@ -146,32 +187,72 @@ class User(Base):
         self.is_active = False
         self.updated_at = datetime.utcnow()
     
+    @classmethod
+    def find_by_email(cls, session: Session, email: str) -> Optional['User']:
+        """Case-insensitive email lookup, answered from ix_users_email_lower"""
+        return session.scalar(select(cls).where(func.lower(cls.email) == func.lower(email)))
+    
     def get_access_history(self, limit: int = 10):
         """Get recent access logs"""
         return self.access_logs.order_by('timestamp desc').limit(limit).all()
     
     def to_dict(self, include_sensitive: bool = False) -> dict:
         """Convert user to dictionary"""
-        data = {
-            'id': self.id,
-            'full_name': self.full_name,
-            'email': self.email,
-            'phone': self.phone,
-            'employee_id': self.employee_id,
-            'department': self.department,
-            'position': self.position,
-            'role': self.role.value,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_access': self.last_access.isoformat() if self.last_access else None,
-        }
+        return self._serialize(self.__getattribute__, include_sensitive)
+    
+    @classmethod
+    def get_user_dicts(cls, session: Session, include_sensitive: bool = False) -> List[dict]:
+        """
+        All users already serialized like to_dict(), read straight from a Core
+        SELECT (no ORM objects) for API pages
+        """
+        keys = cls._BASIC_KEYS + cls._DERIVED_KEYS
+        if include_sensitive:
+            keys += cls._SENSITIVE_KEYS
+        rows = session.execute(select(*(getattr(cls, key) for key in keys)).order_by(cls.id)).mappings()
+        return [cls._serialize(row.__getitem__, include_sensitive) for row in rows]
+    
+    # Columns copied as-is by to_dict; the fields in _DERIVED_KEYS are converted in _serialize
+    _BASIC_KEYS = ('id', 'email', 'phone', 'employee_id', 'department', 'position', 'is_active')
+    _DERIVED_KEYS = ('first_name', 'last_name', 'role', 'created_at', 'last_access')
+    _SENSITIVE_KEYS = ('national_id', 'is_verified', 'suspension_reason', 'notes')
+    
+    @classmethod
+    def _serialize(cls, get, include_sensitive: bool) -> dict:
+        """Build the to_dict() payload from an attribute getter (ORM instance or result row)"""
+        data = {key: get(key) for key in cls._BASIC_KEYS}
+        created_at, last_access = get('created_at'), get('last_access')
+        data['full_name'] = f"{get('first_name')} {get('last_name')}"
+        data['role'] = get('role').value
+        data['created_at'] = created_at.isoformat() if created_at else None
+        data['last_access'] = last_access.isoformat() if last_access else None
         
         if include_sensitive:
-            data.update({
-                'national_id': self.national_id,
-                'is_verified': self.is_verified,
-                'suspension_reason': self.suspension_reason,
-                'notes': self.notes
-            })
+            for key in cls._SENSITIVE_KEYS:
+                data[key] = get(key)
         
         return data
+
+
+# Drop the memoized zone_id_set on grant changes made through either side of the
+# relationship, and whenever the session expires or reloads the user
+@event.listens_for(User.zones, 'append')
+@event.listens_for(User.zones, 'remove')
+def _on_zones_changed(target, value, initiator):
+    target._invalidate_zone_ids()
+
+
+# (raw: the instance may already be garbage-collected when its state is expired)
+@event.listens_for(User, 'expire', raw=True)
+def _on_user_expire(state, attrs):
+    state.dict.pop('_zone_id_set', None)
+
+
+@event.listens_for(User, 'refresh', raw=True)
+def _on_user_refresh(state, context, attrs):
+    state.dict.pop('_zone_id_set', None)
+
+
+# Expression index matching find_by_email's WHERE lower(email) = lower(?)
+Index('ix_users_email_lower', func.lower(User.email))
+
@@ -4,10 +4,13 @@ Zone Model
 Manages physical zones and access control areas
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float
-from sqlalchemy.orm import relationship
+from typing import List, Optional
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, Boolean, Text, Float, event, exists, select
+from sqlalchemy import Index, DDL, update, or_, func
+from sqlalchemy.orm import relationship, object_session, Session
 
 from core.database.corefiles.base import Base
+from core.database.corefiles.clock import utcnow, parse_minutes, format_minutes, in_minute_window
 from core.database.corefiles.associations import user_zone_association
 
 
@@ -51,9 +54,9 @@ class Zone(Base):
     is_restricted = Column(Boolean, default=False, nullable=False)
     restriction_reason = Column(Text, nullable=True)
     
-    # Operating Hours (format: "HH:MM")
-    open_time = Column(String(5), nullable=True)
-    close_time = Column(String(5), nullable=True)
+    # Operating Hours (minutes since midnight; open_time/close_time give HH:MM)
+    open_min = Column(SmallInteger, nullable=True)
+    close_min = Column(SmallInteger, nullable=True)
     
     # Emergency Settings
     emergency_exit = Column(Boolean, default=False, nullable=False)
@@ -72,7 +75,8 @@ class Zone(Base):
     contact_phone = Column(String(20), nullable=True)
     notes = Column(Text, nullable=True)
     
-    # Relationships
+    # Relationships (users and access_logs can be large and are counted/paginated,
+    # so they stay dynamic; the few policies of a zone load as a plain list)
     users = relationship(
         "User",
         secondary=user_zone_association,
@@ -83,7 +87,7 @@ class Zone(Base):
         lazy='dynamic',
     )
     access_logs = relationship("AccessLog", back_populates="zone", cascade="all, delete-orphan", lazy='dynamic')
-    policies = relationship("AccessPolicy", back_populates="zone", cascade="all, delete-orphan", lazy='dynamic')
+    policies = relationship("AccessPolicy", back_populates="zone", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Zone(id={self.id}, name='{self.name}', level={self.security_level})>"
@@ -93,17 +97,39 @@ class Zone(Base):
 
     # Properties
     
+    @property
+    def open_time(self) -> str:
+        """Opening time as HH:MM"""
+        return format_minutes(self.open_min)
+    
+    @open_time.setter
+    def open_time(self, value: str):
+        self.open_min = parse_minutes(value) if value else None
+    
+    @property
+    def close_time(self) -> str:
+        """Closing time as HH:MM"""
+        return format_minutes(self.close_min)
+    
+    @close_time.setter
+    def close_time(self, value: str):
+        self.close_min = parse_minutes(value) if value else None
+    
     @property
     def full_location(self) -> str:
         """Get complete location string"""
+        return self._format_location(self.building, self.floor, self.room_number, self.location)
+    
+    @staticmethod
+    def _format_location(building, floor, room_number, location) -> str:
         parts = []
-        if self.building:
-            parts.append(self.building)
-        if self.floor:
-            parts.append(f"Floor {self.floor}")
-        if self.room_number:
-            parts.append(f"Room {self.room_number}")
-        return ", ".join(parts) if parts else self.location or "Unknown"
+        if building:
+            parts.append(building)
+        if floor:
+            parts.append(f"Floor {floor}")
+        if room_number:
+            parts.append(f"Room {room_number}")
+        return ", ".join(parts) if parts else location or "Unknown"
     
     @property
     def is_at_capacity(self) -> bool:
@@ -135,21 +161,22 @@ class Zone(Base):
     
     def is_open(self, check_time: datetime = None) -> bool:
         """Check if zone is currently open"""
-        if not self.open_time or not self.close_time:
+        if self.open_min is None or self.close_min is None:
             return True
         
         if not check_time:
-            check_time = datetime.utcnow()
+            check_time = utcnow()
         
-        current_time = check_time.strftime("%H:%M")
-        return self.open_time <= current_time <= self.close_time
+        # Closing before opening means the zone is open overnight
+        return in_minute_window(check_time.hour * 60 + check_time.minute, self.open_min, self.close_min)
     
-    def can_enter(self, user=None) -> tuple[bool, str]:
+    def can_enter(self, user=None, now: datetime = None) -> tuple[bool, str]:
         """
         Check if zone can be entered
         
         Args:
             user: User object (optional)
+            now: Time to check at (default: current time)
             
         Returns:
             tuple: (can_enter, reason)
@@ -162,39 +189,71 @@ class Zone(Base):
         if self.is_restricted:
             return False, f"Zone is restricted: {self.restriction_reason}"
         
-        # Check capacity
-        if self.is_at_capacity:
-            return False, "Zone is at maximum capacity"
+        # Check capacity (re-read first: occupancy moves through Core UPDATEs, which
+        # never reach long-lived instances such as the NFC handler's zone cache)
+        if self.max_capacity:
+            self.refresh_occupancy()
+            if self.is_at_capacity:
+                return False, "Zone is at maximum capacity"
         
         # Check operating hours
-        if not self.is_open():
+        if not self.is_open(now):
             return False, "Zone is closed"
         
         # Check user access if provided
         if user:
-            if not self.has_user_access(user.id):
+            if not user.has_zone_access(self.id):
                 return False, "User does not have access to this zone"
         
         return True, "Entry allowed"
     
     def has_user_access(self, user_id: int) -> bool:
-        """Check if user has access to this zone"""
-        return self.users.filter_by(id=user_id).count() > 0
+        """Check if user has access to this zone (EXISTS, stops at the first match)"""
+        return object_session(self).scalar(select(exists().where(
+            user_zone_association.c.zone_id == self.id,
+            user_zone_association.c.user_id == user_id,
+        )))
     
     def get_authorized_users(self):
         """Get all users with access to this zone"""
         return self.users.all()
     
-    def increment_occupancy(self):
-        """Increase current occupancy count"""
-        if not self.max_capacity or self.current_occupancy < self.max_capacity:
-            self.current_occupancy += 1
-            self.last_accessed = datetime.utcnow()
-    
-    def decrement_occupancy(self):
-        """Decrease current occupancy count"""
-        if self.current_occupancy > 0:
-            self.current_occupancy -= 1
+    def increment_occupancy(self, now: datetime = None) -> bool:
+        """
+        Increase current occupancy count with one conditional UPDATE, so concurrent
+        entries cannot overshoot max_capacity or lose increments
+        
+        Returns:
+            bool: False if the zone was already at capacity
+        """
+        cls = type(self)
+        return self._update_occupancy(
+            or_(cls.max_capacity.is_(None), cls.max_capacity == 0, cls.current_occupancy < cls.max_capacity),
+            current_occupancy=cls.current_occupancy + 1, last_accessed=now or datetime.utcnow(),
+        )
+    
+    def decrement_occupancy(self) -> bool:
+        """Decrease current occupancy count (atomic, never below zero)"""
+        cls = type(self)
+        return self._update_occupancy(cls.current_occupancy > 0, current_occupancy=cls.current_occupancy - 1)
+    
+    def _update_occupancy(self, condition, **values) -> bool:
+        """Guarded UPDATE of this zone's row; loaded attributes are synchronized in memory"""
+        session = object_session(self)
+        if session is None:
+            raise ValueError("Zone must be added to a session first")
+        if self.id is None:
+            session.flush()
+        cls = type(self)
+        result = session.execute(update(cls).where(cls.id == self.id, condition).values(**values))
+        return result.rowcount > 0
+    
+    def refresh_occupancy(self) -> int:
+        """Reload current_occupancy from the database (no-op for unsaved zones)"""
+        session = object_session(self)
+        if session is not None and self.id is not None:
+            session.refresh(self, ['current_occupancy'])
+        return self.current_occupancy
     
     def reset_occupancy(self):
         """Reset occupancy to zero"""
@@ -232,32 +291,33 @@ class Zone(Base):
             open_time: Opening time in HH:MM format
             close_time: Closing time in HH:MM format
         """
-        self.open_time = open_time
-        self.close_time = close_time
+        self.open_min = parse_minutes(open_time)
+        self.close_min = parse_minutes(close_time)
         self.updated_at = datetime.utcnow()
     
     def get_access_history(self, limit: int = 10):
         """Get recent access logs for this zone"""
         return self.access_logs.order_by('timestamp desc').limit(limit).all()
     
+    @classmethod
+    def find_by_name(cls, session: Session, name: str) -> Optional['Zone']:
+        """Case-insensitive name lookup, answered from ix_zones_name_lower"""
+        return session.scalar(select(cls).where(func.lower(cls.name) == func.lower(name)))
+    
+    @classmethod
+    def search_by_name(cls, session: Session, query: str, limit: int = 20) -> List['Zone']:
+        """Zones whose name contains query, case-insensitively (trigram index on PostgreSQL)"""
+        return session.scalars(
+            select(cls).where(cls.name.icontains(query, autoescape=True)).order_by(cls.name).limit(limit)
+        ).all()
+    
     def get_active_policies(self):
         """Get all active policies for this zone"""
-        return self.policies.filter_by(is_active=True).order_by('priority desc').all()
+        return sorted((p for p in self.policies if p.is_active), key=lambda p: p.priority, reverse=True)
     
     def to_dict(self, include_stats: bool = False) -> dict:
         """Convert zone to dictionary"""
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'code': self.code,
-            'description': self.description,
-            'zone_type': self.zone_type,
-            'security_level': self.security_level,
-            'full_location': self.full_location,
-            'is_active': self.is_active,
-            'is_restricted': self.is_restricted,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        data = self._serialize(self.__getattribute__)
         
         if include_stats:
             data.update({
@@ -271,3 +331,46 @@ class Zone(Base):
             })
         
         return data
+    
+    @classmethod
+    def get_zone_dicts(cls, session: Session) -> List[dict]:
+        """
+        All zones serialized like to_dict() (without stats), read straight from a
+        Core SELECT (no ORM objects) for API pages
+        """
+        keys = cls._BASIC_KEYS + cls._DERIVED_KEYS
+        rows = session.execute(select(*(getattr(cls, key) for key in keys)).order_by(cls.id)).mappings()
+        return [cls._serialize(row.__getitem__) for row in rows]
+    
+    # Columns copied as-is by to_dict; the fields in _DERIVED_KEYS are converted in _serialize
+    _BASIC_KEYS = ('id', 'name', 'code', 'description', 'zone_type', 'security_level', 'is_active', 'is_restricted')
+    _DERIVED_KEYS = ('building', 'floor', 'room_number', 'location', 'created_at')
+    
+    @classmethod
+    def _serialize(cls, get) -> dict:
+        """Build the to_dict() payload from an attribute getter (ORM instance or result row)"""
+        data = {key: get(key) for key in cls._BASIC_KEYS}
+        created_at = get('created_at')
+        data['full_location'] = cls._format_location(get('building'), get('floor'), get('room_number'), get('location'))
+        data['created_at'] = created_at.isoformat() if created_at else None
+        return data
+
+
+# Expression index matching find_by_name's WHERE lower(name) = lower(?)
+Index('ix_zones_name_lower', func.lower(Zone.name))
+
+# PostgreSQL: trigram index so search_by_name's ILIKE '%...%' is not a sequential scan
+event.listen(
+    Zone.__table__, 'before_create',
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect='postgresql'),
+)
+Index('ix_zones_name_trgm', Zone.name, postgresql_using='gin',
+      postgresql_ops={'name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql')
+
+
+
+# Grants made through Zone.users invalidate the user's memoized zone_id_set
+@event.listens_for(Zone.users, 'append')
+@event.listens_for(Zone.users, 'remove')
+def _on_users_changed(target, value, initiator):
+    value._invalidate_zone_ids()
@@ -0,0 +1,54 @@
+"""
+Database Engine and Sessions
+Path: core/database/session.py
+
+The one engine (and connection pool) of the process, shared by run.py, the
+background tasks and the API routes.
+"""
+
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+
+DB_URI = os.getenv("DATABASE_URL", "sqlite:///nfc_access.db")
+
+
+def _engine_options(uri: str) -> dict:
+    """create_engine keyword arguments for the given database URI"""
+    if uri.startswith("sqlite"):
+        # Sessions are used from the Flask, NFC and rollup threads
+        return {"connect_args": {"check_same_thread": False}}
+    # Server databases: check connections on checkout, keep a warm pool for the API
+    return {"pool_pre_ping": True, "pool_size": 20, "max_overflow": 10}
+
+
+engine = create_engine(DB_URI, **_engine_options(DB_URI))
+
+
+if engine.dialect.name == 'sqlite':
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        WAL lets readers run alongside the writer, and synchronous=NORMAL syncs at
+        checkpoints instead of on every commit. A power loss can drop the last
+        commits but leaves the database consistent.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB
+        cursor.close()
+
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+__all__ = [
+    'DB_URI',
+    'engine',
+    'SessionLocal',
+]
@@ -0,0 +1,251 @@
+"""
+Schema Upgrade
+Path: core/database/upgrade_sqlite.py
+
+One-off upgrade of a database written by the original schema (string enums,
+hex SHA-256 uid_hash, integer log ids, "HH:MM" and comma-separated policy
+columns) to the current models. Most of these columns cannot be altered in
+place, so the data is copied into a freshly created database.
+
+SQLite: the copy then replaces the original file, which is kept next to it as
+<path>.bak.
+
+PostgreSQL (or any other server database): create an empty database, copy
+into it, then point DATABASE_URL at it. The copy also builds the partitioned
+access_logs table with one partition per month of copied logs and moves the
+id sequences past the copied ids.
+
+Usage:
+    python -m core.database.upgrade_sqlite [path]                  (default: nfc_access.db)
+    python -m core.database.upgrade_sqlite SOURCE_URL TARGET_URL    (TARGET_URL: an empty database)
+"""
+
+import json
+import logging
+import os
+import sys
+from enum import Enum
+from typing import Dict, List, Type
+
+from sqlalchemy import MetaData, create_engine, insert, inspect, select, text
+from sqlalchemy.orm import Session
+
+from core.database.corefiles.base import Base
+from core.database.corefiles.clock import parse_minutes, to_epoch_ns
+from core.database.corefiles.enums import AccessStatus, CardStatus, PolicyType, UserRole
+from core.database.corefiles.associations import (
+    policy_whitelist_association,
+    policy_blacklist_association,
+    policy_role_association,
+)
+from core.database.corefiles.types import uuid7_at
+# Register every model table on Base.metadata
+from core.database.modelsfiles.access_log import AccessLog
+from core.database.modelsfiles.access_log_rollup import AccessLogHourly
+from core.database.modelsfiles.access_policy import AccessPolicy  # noqa: F401
+from core.database.modelsfiles.card import Card
+from core.database.modelsfiles.user import User  # noqa: F401
+from core.database.modelsfiles.zone import Zone  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# Tables copied from the old database, parents first
+_TABLES = (
+    'users', 'zones', 'access_policies', 'cards', 'user_zone_association',
+    'card_zone_association', 'zone_policy_association', 'user_policy_association', 'access_logs',
+)
+
+
+def needs_upgrade(engine) -> bool:
+    """True if the database still has the original zones/cards layout"""
+    inspector = inspect(engine)
+    if not inspector.has_table('zones'):
+        return False
+    return 'open_min' not in {column['name'] for column in inspector.get_columns('zones')}
+
+
+def upgrade(path: str) -> bool:
+    """
+    Upgrade the SQLite database at path in place (original kept as path + '.bak')
+
+    Returns:
+        bool: False if the database was already current
+    """
+    target = f"{path}.upgrading"
+    if os.path.exists(target):
+        os.remove(target)
+    if not copy_database(f"sqlite:///{path}", f"sqlite:///{target}"):
+        return False
+
+    os.replace(path, f"{path}.bak")
+    os.replace(target, path)
+    return True
+
+
+def copy_database(source_url: str, target_url: str) -> bool:
+    """
+    Copy an original-schema database into the empty database at target_url,
+    creating the current schema there first
+
+    Returns:
+        bool: False (and nothing written) if the source already uses the current schema
+    """
+    old_engine = create_engine(source_url)
+    try:
+        if not needs_upgrade(old_engine):
+            return False
+        old = MetaData()
+        old.reflect(old_engine)
+        with old_engine.connect() as conn:
+            tables = {name: [dict(row) for row in conn.execute(select(old.tables[name])).mappings()]
+                      for name in _TABLES if name in old.tables}
+    finally:
+        old_engine.dispose()
+
+    new_engine = create_engine(target_url)
+    try:
+        Base.metadata.create_all(new_engine)
+        with Session(new_engine) as session:
+            logs = tables.get('access_logs')
+            if logs:
+                # PostgreSQL: a partition for every copied month, so nothing lands in the default one
+                AccessLog.ensure_partitions(session.connection(), since=min(row['timestamp'] for row in logs))
+            _copy(session, tables)
+            _sync_sequences(session)
+            AccessLogHourly.refresh(session)
+            session.commit()
+    finally:
+        new_engine.dispose()
+    return True
+
+
+def _copy(session: Session, tables: Dict[str, List[dict]]):
+    policy_links = []
+    for name in _TABLES:
+        rows = tables.get(name, [])
+        convert = _CONVERTERS.get(name)
+        if convert is not None:
+            for row in rows:
+                if name == 'access_policies':
+                    policy_links.append(_policy_links(row))
+                convert(row)
+        _insert(session, Base.metadata.tables[name], rows)
+        logger.info(f"{name}: {len(rows)} rows")
+
+    for table, link_rows in zip((policy_whitelist_association, policy_blacklist_association, policy_role_association),
+                                zip(*policy_links) if policy_links else ((), (), ())):
+        _insert(session, table, [row for rows in link_rows for row in rows])
+
+
+def _sync_sequences(session: Session):
+    """PostgreSQL: copied rows keep their ids, which does not advance the serial sequences"""
+    if session.get_bind().dialect.name != 'postgresql':
+        return
+    for table in Base.metadata.sorted_tables:
+        column = table.autoincrement_column
+        if column is not None:
+            session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', '{column.name}'), "
+                f"COALESCE(MAX({column.name}), 0) + 1, false) FROM {table.name}"
+            ))
+
+
+def _insert(session: Session, table, rows: List[dict]):
+    if not rows:
+        return
+    keys = {column.name: column.key for column in table.columns}
+    session.execute(insert(table), [
+        {keys[name]: value for name, value in row.items() if name in keys} for row in rows
+    ])
+
+
+def _member(enum_cls: Type[Enum], value):
+    """Old SQLEnum columns stored member names; accept values too"""
+    if value is None or isinstance(value, enum_cls):
+        return value
+    return enum_cls.__members__.get(value) or enum_cls(value)
+
+
+def _minutes(value):
+    return parse_minutes(value) if value else None
+
+
+def _split(value) -> List[str]:
+    return [part.strip() for part in value.split(',') if part.strip()] if value else []
+
+
+def _roles(value) -> set:
+    return {_member(UserRole, role).value for role in _split(value)}
+
+
+# Per-table row conversions (in place)
+
+def _convert_user(row: dict):
+    row['role'] = _member(UserRole, row['role'])
+
+
+def _convert_zone(row: dict):
+    row['open_min'] = _minutes(row.pop('open_time', None))
+    row['close_min'] = _minutes(row.pop('close_time', None))
+
+
+def _convert_policy(row: dict):
+    row['policy_type'] = _member(PolicyType, row['policy_type'])
+    row['time_start_min'] = _minutes(row.pop('time_start', None))
+    row['time_end_min'] = _minutes(row.pop('time_end', None))
+    mask = 0
+    for day in _split(row.pop('days_of_week', None)):
+        mask |= 1 << int(day)
+    row['days_mask'] = mask or None
+
+
+def _policy_links(row: dict) -> tuple:
+    """Association rows for the old comma-separated user and role lists of a policy"""
+    policy_id = row['id']
+    whitelist = [{'policy_id': policy_id, 'user_id': int(uid)} for uid in set(_split(row.get('whitelist_users')))]
+    blacklist = [{'policy_id': policy_id, 'user_id': int(uid)} for uid in set(_split(row.get('blacklist_users')))]
+    roles = [{'policy_id': policy_id, 'role': role, 'is_allowed': True} for role in _roles(row.get('allowed_roles'))]
+    roles += [{'policy_id': policy_id, 'role': role, 'is_allowed': False} for role in _roles(row.get('denied_roles'))]
+    return whitelist, blacklist, roles
+
+
+def _convert_card(row: dict):
+    # Old rows hold the SHA-256 hex of the UID; rehash the stored UID (normalized
+    # like NFCHandler does) with the configured keyed backend
+    uid_hash = Card.hash_uid(row['uid'].replace(':', '').upper().strip())
+    row['uid_hash'] = uid_hash
+    row['uid_fp'] = Card.uid_fingerprint(uid_hash)
+    row['status'] = _member(CardStatus, row['status'])
+    row['expires_at_ns'] = to_epoch_ns(row['expires_at']) if row['expires_at'] else None
+
+
+def _convert_log(row: dict):
+    # Integer ids become UUIDv7 stamped with the log's own time, so id order stays time order
+    row['id'] = uuid7_at(to_epoch_ns(row['timestamp']) // 1_000_000)
+    row['status'] = _member(AccessStatus, row['status'])
+    metadata = row.get('metadata')
+    row['metadata'] = json.loads(metadata) if metadata else None
+
+_CONVERTERS = {
+    'users': _convert_user,
+    'zones': _convert_zone,
+    'access_policies': _convert_policy,
+    'cards': _convert_card,
+    'access_logs': _convert_log,
+}
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if len(sys.argv) == 3:
+        source_url, target_url = sys.argv[1:]
+        if copy_database(source_url, target_url):
+            logger.info("Copied into the target database; point DATABASE_URL at it")
+        else:
+            logger.info("The source database already uses the current schema")
+        sys.exit()
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "nfc_access.db"
+    if upgrade(db_path):
+        logger.info(f"Upgraded {db_path} (previous file kept as {db_path}.bak)")
+    else:
+        logger.info(f"{db_path} already uses the current schema")
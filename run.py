@@ -5,18 +5,23 @@ Path: /run.py
 
 import os
 import threading
+import time
 import logging
-from flask import Flask, render_template
+from flask import Flask, render_template, g
 from dotenv import load_dotenv
 
+# Load .env before the application modules read their settings at import time
+load_dotenv()
+
 # --- Database Imports ---
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from core.database.corefiles.base import Base
+from core.database.corefiles.clock import freeze_now, unfreeze_now
+from core.database.session import engine, SessionLocal
 # Ensure all models are imported so SQLAlchemy registers their tables
-from core.database.modelsfiles.access_log import AccessLog  # noqa: F401
+from core.database.modelsfiles.access_log import AccessLog
+from core.database.modelsfiles.access_log_rollup import AccessLogHourly
 from core.database.modelsfiles.access_policy import AccessPolicy  # noqa: F401
-from core.database.modelsfiles.card import Card  # noqa: F401
+from core.database.modelsfiles.card import Card, UID_HASH_BACKEND  # noqa: F401
 from core.database.modelsfiles.user import User  # noqa: F401
 from core.database.modelsfiles.zone import Zone  # noqa: F401
 
@@ -25,10 +30,12 @@ from core.database.modelsfiles.zone import Zone  # noqa: F401
 from core.settings.configs import Config 
 
 from web.api.routes import api_bp
+from web.api.json_provider import OrjsonProvider, orjson
 
 # --- NFC Core & Logic Imports ---
 from core.NFC.nfc_core import NFCReader
 from core.NFC.nfc_handler import NFCHandler
+from core.NFC.log_writer import AccessLogWriter
 
 
 logging.basicConfig(
@@ -38,17 +45,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-load_dotenv()
-
-
-DB_URI = os.getenv("DATABASE_URL", "sqlite:///nfc_access.db")
-
-engine_kwargs = {"check_same_thread": False} if "sqlite" in DB_URI else {}
-engine = create_engine(DB_URI, connect_args=engine_kwargs)
-
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
 def ensure_default_zone():
     zone_id = int(os.getenv("DEFAULT_ZONE_ID", 1))
     zone_name = os.getenv("DEFAULT_ZONE_NAME", "Main Entrance")
@@ -76,10 +72,23 @@ def create_app() -> Flask:
     
     app = Flask(__name__, template_folder='web/templates', static_folder='web/static')
     app.config.from_object(Config)
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
     
     
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    # One clock reading per request for every expiry/validity/opening-hours check
+    @app.before_request
+    def _freeze_clock():
+        g.clock_token = freeze_now()
+    
+    @app.teardown_request
+    def _unfreeze_clock(exc):
+        token = g.pop('clock_token', None)
+        if token is not None:
+            unfreeze_now(token)
+    
     @app.route('/')
     def index():
         return render_template('index.html')
@@ -91,15 +100,23 @@ def nfc_background_task():
     logger.info("Initializing NFC Background Task...")
     
   
-    db_session = SessionLocal()
+    # Keep objects loaded across commits so the handler's caches stay warm
+    db_session = SessionLocal(expire_on_commit=False)
+    log_writer = AccessLogWriter(SessionLocal)
+    log_writer.start()
     
     try:
       
         use_mock = os.getenv("USE_MOCK_NFC", "True").lower() == "true"
-        reader = NFCReader(use_mock=use_mock) 
+        irq_line = os.getenv("NFC_IRQ_LINE")
+        reader = NFCReader(
+            use_mock=use_mock,
+            irq_chip=os.getenv("NFC_IRQ_CHIP"),
+            irq_line=int(irq_line) if irq_line else None,
+        )
         
      
-        handler = NFCHandler(db_session)
+        handler = NFCHandler(db_session, log_writer=log_writer)
 
        
         def on_card_tap(uid: str):
@@ -124,13 +141,42 @@ def nfc_background_task():
     except Exception as e:
         logger.error(f"NFC Background Task encountered an error: {e}")
     finally:
+        log_writer.stop()
         db_session.close()
         logger.info("NFC Background Task stopped and DB session closed.")
 
+def ensure_log_partitions():
+    """Create the upcoming monthly access_logs partitions (PostgreSQL only)."""
+    try:
+        with engine.begin() as connection:
+            for name in AccessLog.ensure_partitions(connection):
+                logger.info(f"Created access log partition {name}")
+    except Exception as e:
+        logger.error(f"Access log partition maintenance failed: {e}")
+
+def rollup_background_task(interval: float = 300):
+    """Periodically fold new access logs into the hourly rollup table."""
+    while True:
+        # Long-running processes also need next month's partition before it starts
+        ensure_log_partitions()
+        session = SessionLocal()
+        try:
+            AccessLogHourly.refresh(session)
+            session.commit()
+        except Exception as e:
+            logger.error(f"Access log rollup failed: {e}")
+            session.rollback()
+        finally:
+            session.close()
+        time.sleep(interval)
+
 if __name__ == '__main__':
   
+    # Stored uid_hash values are only valid for the backend that produced them
+    logger.info(f"Card UID hashing backend: {UID_HASH_BACKEND}")
     logger.info("Ensuring database tables exist...")
     Base.metadata.create_all(bind=engine)
+    ensure_log_partitions()
     ensure_default_zone()
     
     
@@ -140,6 +186,9 @@ if __name__ == '__main__':
     nfc_thread = threading.Thread(target=nfc_background_task, daemon=True)
     nfc_thread.start()
     
+    rollup_interval = float(os.getenv("ROLLUP_INTERVAL_SECONDS", 300))
+    threading.Thread(target=rollup_background_task, args=(rollup_interval,), daemon=True).start()
+    
 
     port = int(os.getenv("PORT", 5000))
     host = os.getenv("HOST", "0.0.0.0")
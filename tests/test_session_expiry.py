@@ -0,0 +1,71 @@
+"""
+Session Expiry Regressions
+Path: tests/test_session_expiry.py
+
+Taps and policy reads through a default SessionLocal(), whose commits expire
+every loaded instance (the NFC thread and the simulator use expire_on_commit=False).
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+
+_DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+
+from core.database.corefiles.base import Base  # noqa: E402
+from core.database.session import engine, SessionLocal  # noqa: E402
+from core.database.corefiles.enums import AccessStatus, PolicyType  # noqa: E402
+from core.database.modelsfiles.access_policy import AccessPolicy  # noqa: E402
+from core.database.modelsfiles.card import Card  # noqa: E402
+from core.database.modelsfiles.user import User  # noqa: E402
+from core.database.modelsfiles.zone import Zone  # noqa: E402
+from core.NFC.nfc_handler import NFCHandler  # noqa: E402
+
+
+class SessionExpiryTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        Base.metadata.create_all(engine)
+        session = SessionLocal()
+        user = User(first_name="Test", last_name="User", email="test@example.com")
+        zone = Zone(id=1, name="Main Entrance")
+        user.zones.append(zone)
+        session.add_all([user, zone, Card(uid="04A1B2C3", uid_hash=Card.hash_uid("04A1B2C3"), user=user)])
+        # Policies live on a zone of their own so they cannot affect the tap tests
+        session.add(Zone(id=2, name="Server Room"))
+        session.add(AccessPolicy(zone_id=2, policy_type=PolicyType.CUSTOM, name="Audit"))
+        session.commit()
+        session.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        engine.dispose()
+
+    def test_repeated_taps_with_default_session(self):
+        session = SessionLocal()
+        handler = NFCHandler(session)
+        try:
+            for _ in range(3):
+                result = handler.process_tap(raw_uid="04:a1:b2:c3", zone_id=1)
+                self.assertTrue(result["success"], result)
+                self.assertEqual(result["status"], AccessStatus.GRANTED.value)
+        finally:
+            session.close()
+
+    def test_commit_after_reading_zone_policies(self):
+        session = SessionLocal()
+        try:
+            zone = session.get(Zone, 2)
+            self.assertEqual(len(zone.get_active_policies()), 1)
+            session.commit()
+            self.assertEqual([policy.name for policy in zone.get_active_policies()], ["Audit"])
+        finally:
+            session.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+"""
+JSON Provider
+Path: web/api/json_provider.py
+
+Flask JSON provider backed by orjson, used for every jsonify() response when
+orjson is installed (see run.create_app). Output matches Flask's default
+provider: sorted keys, compact unless Flask asks for indentation.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: Flask's stdlib-json provider stays in place
+    orjson = None
+
+
+_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson doing the encoding and decoding"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = _OPTIONS | orjson.OPT_INDENT_2 if kwargs.get('indent') else _OPTIONS
+        # Types orjson does not know (Decimal, dataclasses, __html__) go through Flask's default
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+__all__ = [
+    'OrjsonProvider',
+    'orjson',
+]
@@ -5,40 +5,65 @@ Path: web/api/routes.py
 Defines the REST API endpoints for the web interface.
 """
 
-import os
-from flask import Blueprint, jsonify, request
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import hashlib
+import threading
+import uuid
+from datetime import datetime
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session
 
 # --- Importing Models and Logic ---
+from core.database.session import SessionLocal
 from core.database.modelsfiles.user import User
 from core.database.modelsfiles.access_log import AccessLog
 from core.database.modelsfiles.zone import Zone
+from core.NFC.nfc_handler import NFCHandler
+from core.NFC.nfc_cache import TTLCache
 
 
 api_bp = Blueprint('api_bp', __name__)
 
+# One session per request thread on the shared engine's pool, released at teardown
+db_session = scoped_session(SessionLocal)
 
-DB_URI = os.getenv("DATABASE_URL", "sqlite:///nfc_access.db")
-engine_kwargs = {"check_same_thread": False} if "sqlite" in DB_URI else {}
-engine = create_engine(DB_URI, connect_args=engine_kwargs)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@api_bp.teardown_request
+def _remove_session(exc):
+    db_session.remove()
+
+
+# Encoded /zones body and its ETag. Zone writes in this process clear it; the TTL
+# bounds staleness for writes made by other processes.
+_zones_response = TTLCache(maxsize=1, ttl=60)
+
+
+def _clear_zones_response(mapper, connection, target):
+    _zones_response.clear()
+
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Zone, _event, _clear_zones_response)
 
 
 @api_bp.route('/zones', methods=['GET'])
 def get_zones():
-    session = SessionLocal()
-    try:
-        zones = session.query(Zone).all()
-        zones_data = [zone.to_dict() for zone in zones]
-        
-        return jsonify({
+    cached = _zones_response.get('zones')
+    if cached is None:
+        zones_data = Zone.get_zone_dicts(db_session())
+        body = jsonify({
             "success": True,
             "count": len(zones_data),
             "data": zones_data
-        }), 200
-    finally:
-        session.close()
+        }).get_data()
+        cached = (body, hashlib.blake2b(body, digest_size=8).hexdigest())
+        _zones_response['zones'] = cached
+    
+    body, etag = cached
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    # 304 without a body when the client's If-None-Match still matches
+    return response.make_conditional(request)
 
 @api_bp.route('/status', methods=['GET'])
 def get_status():
@@ -52,42 +77,54 @@ def get_status():
 @api_bp.route('/logs', methods=['GET'])
 def get_recent_logs():
    
-    limit = request.args.get('limit', default=10, type=int)
-    session = SessionLocal()
+    limit = max(1, request.args.get('limit', default=10, type=int))
+    # Keyset cursor: timestamp and id of the last log of the previous page
+    before = request.args.get('before', type=datetime.fromisoformat)
+    before_id = request.args.get('before_id', type=uuid.UUID)
     
     try:
       
-        logs = session.query(AccessLog).order_by(AccessLog.timestamp.desc()).limit(limit).all()
-        
-        
-        logs_data = [log.to_dict(include_details=True) for log in logs]
+        logs_data = AccessLog.get_log_dicts(db_session(), limit=limit, include_details=True,
+                                            before=before, before_id=before_id)
+        # A full page means there may be more; an empty one never has a cursor
+        last = logs_data[-1] if len(logs_data) == limit else None
         
         return jsonify({
             "success": True,
             "count": len(logs_data),
-            "data": logs_data
+            "data": logs_data,
+            "next_before": last['timestamp'] if last else None,
+            "next_before_id": last['id'] if last else None
         }), 200
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
-    finally:
-        session.close()
 
 @api_bp.route('/users', methods=['GET'])
 def get_users():
    
-    session = SessionLocal()
-    try:
-        users = session.query(User).all()
-        users_data = [user.to_dict() for user in users]
-        
-        return jsonify({
-            "success": True,
-            "count": len(users_data),
-            "data": users_data
-        }), 200
-    finally:
-        session.close()
+    users_data = User.get_user_dicts(db_session())
+    
+    return jsonify({
+        "success": True,
+        "count": len(users_data),
+        "data": users_data
+    }), 200
+
+# One NFCHandler for the simulator, built on first use, so its zone/card/policy caches
+# stay warm across requests. Like the NFC thread's handler it owns a long-lived session
+# (the request-scoped one is closed at teardown, detaching cached objects); taps are
+# serialized because a Session is not thread-safe.
+_tap_lock = threading.Lock()
+_handler = None
+
+
+def _tap_handler() -> NFCHandler:
+    global _handler
+    if _handler is None:
+        _handler = NFCHandler(SessionLocal(expire_on_commit=False))
+    return _handler
+
 
 @api_bp.route('/simulate-tap', methods=['POST'])
 def simulate_nfc_tap():
@@ -100,16 +137,12 @@ def simulate_nfc_tap():
     zone_id = data.get('zone_id', 1) 
     device_id = "API_SIMULATOR"
     
-    session = SessionLocal()
-    handler = NFCHandler(session)
-    
     try:
        
-        result = handler.process_tap(raw_uid=uid, zone_id=zone_id, device_id=device_id)
+        with _tap_lock:
+            result = _tap_handler().process_tap(raw_uid=uid, zone_id=zone_id, device_id=device_id)
         
         return jsonify(result), 200 if result['success'] else 403
         
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
-    finally:
-        session.close()